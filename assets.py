@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# Shared asset manager: every file is decoded once per process, GIF frames
+# are decoded in the background and kept in an on-disk cache, so restarts
+# and later cold starts skip Pillow entirely (it is only imported to decode).
+import hashlib
+import json
+import os
+import threading
+
+import pygame
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.asset_cache')
+
+
+def decode_gif(filename, size):
+    # Returns (raw RGBA frame bytes, durations in seconds)
+    from PIL import Image, ImageSequence  # 添加Pillow库支持
+    frames = []
+    durations = []
+    # 使用Pillow加载GIF
+    pil_image = Image.open(filename)
+    for frame in ImageSequence.Iterator(pil_image):
+        # 转换为RGBA模式（确保有alpha通道）
+        frame = frame.convert("RGBA")
+        # 调整大小
+        frame = frame.resize(size, Image.LANCZOS)
+        frames.append(frame.tobytes())
+        # 获取帧延迟（毫秒）
+        try:
+            durations.append(frame.info['duration'] / 1000)  # 转换为秒
+        except:
+            durations.append(0.1)  # 默认0.1秒
+
+    if not durations:
+        durations = [0.1] * len(frames)
+    return frames, durations
+
+
+class AssetManager:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.images = {}
+        self.gifs = {}
+        # GIFs being decoded in the background: key -> (Event, result holder)
+        self.pending = {}
+        # Images waiting to be loaded by load_deferred() on the main thread
+        self.deferred = []
+        self.lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+
+    def image(self, filename, size=None, alpha=True):
+        # Loaded and scaled once; a failed load is remembered and re-raised
+        key = (filename, size, alpha)
+        if key not in self.images:
+            try:
+                image = pygame.image.load(filename)
+                image = image.convert_alpha() if alpha else image.convert()
+                if size:
+                    image = pygame.transform.scale(image, size)
+                self.images[key] = image
+            except (pygame.error, OSError) as error:
+                self.images[key] = error
+        image = self.images[key]
+        if isinstance(image, Exception):
+            raise image
+        return image
+
+    def gif(self, filename, size):
+        # (frames, durations) with frames as display-ready Surfaces
+        key = (filename, size)
+        if key not in self.gifs:
+            try:
+                frames, durations = self.decoded_gif(filename, size)
+                self.gifs[key] = ([pygame.image.fromstring(frame, size, "RGBA").convert_alpha()
+                                   for frame in frames], durations)
+            except Exception as error:
+                self.gifs[key] = error
+        gif = self.gifs[key]
+        if isinstance(gif, Exception):
+            raise gif
+        return gif
+
+    def preload(self, gifs=(), images=()):
+        # Decode GIFs on a worker thread; Surfaces are still created on the
+        # calling thread by gif(), which waits for the decode if needed.
+        # Images are only queued, for load_deferred() to pick up when idle.
+        jobs = []
+        with self.lock:
+            for filename, size in gifs:
+                key = (filename, size)
+                if key not in self.gifs and key not in self.pending:
+                    self.pending[key] = (threading.Event(), [])
+                    jobs.append((key,) + self.pending[key])
+        if jobs:
+            threading.Thread(target=self.decode_jobs, args=(jobs,), daemon=True).start()
+        self.deferred.extend(images)
+
+    def load_deferred(self):
+        # One step of idle-time loading: the next queued image, or the
+        # Surfaces of a GIF whose frames are decoded. False when nothing is left.
+        if self.deferred:
+            try:
+                self.image(*self.deferred.pop(0))
+            except (pygame.error, OSError):
+                pass
+            return True
+        with self.lock:
+            ready = [key for key, (done, _) in self.pending.items() if done.is_set()]
+        for key in ready:
+            try:
+                self.gif(*key)
+            except Exception:
+                pass
+            return True
+        return bool(self.pending)
+
+    def decode_jobs(self, jobs):
+        for key, done, result in jobs:
+            try:
+                result.append(self.load_frames(*key))
+            except Exception as error:
+                result.append(error)
+            done.set()
+
+    def decoded_gif(self, filename, size):
+        with self.lock:
+            pending = self.pending.pop((filename, size), None)
+        if pending is None:
+            return self.load_frames(filename, size)
+        done, result = pending
+        done.wait()
+        if isinstance(result[0], Exception):
+            raise result[0]
+        return result[0]
+
+    def cache_path(self, filename, size):
+        # Keyed by file mtime and size, so editing the GIF invalidates the entry
+        stat = os.stat(filename)
+        key = f"{os.path.abspath(filename)}|{stat.st_mtime_ns}|{stat.st_size}|{size[0]}x{size[1]}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.frames')
+
+    def load_frames(self, filename, size):
+        path = self.cache_path(filename, size)
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                data = f.read()
+            frame_bytes = size[0] * size[1] * 4
+            if header['size'] == list(size) and len(data) == frame_bytes * len(header['durations']):
+                self.disk_hits += 1
+                frames = [data[i:i + frame_bytes] for i in range(0, len(data), frame_bytes)]
+                return frames, header['durations']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        self.disk_misses += 1
+        frames, durations = decode_gif(filename, size)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps({'size': list(size), 'durations': durations}).encode() + b'\n')
+                f.write(b''.join(frames))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # 缓存写入失败不影响游戏
+        return frames, durations
+
+
+# Shared by every renderer in the process
+assets = AssetManager()
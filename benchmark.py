@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+# Performance benchmarks
+#   python benchmark.py pathfinding [--sizes 125 250 500 1000 2000]
+#   python benchmark.py game [--sizes 30 100] [--monsters 5 100] [--output results.json]
+#   python benchmark.py game --compare results.json   # ratios against an earlier run
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from corridors import ClusterLayer, CorridorGraph
+from pathfinding import find_path, flatten_grid
+
+GAME_SIZES = [30, 100, 300, 1000]
+MONSTER_COUNTS = [5, 100, 10000]
+
+
+def carve_maze(width, height, rng):
+    # Perfect maze with the same layout rules as Maze.generate_maze, carved
+    # iteratively on a flat buffer so that huge sizes are cheap to set up
+    cells = bytearray(b'\x01') * (width * height)
+    start = width + 1
+    cells[start] = 0
+    stack = [start]
+    steps = (-2 * width, 2, 2 * width, -2)
+    while stack:
+        current = stack[-1]
+        y, x = divmod(current, width)
+        neighbors = []
+        if y > 1 and cells[current + steps[0]]:
+            neighbors.append(steps[0])
+        if x < width - 2 and cells[current + steps[1]]:
+            neighbors.append(steps[1])
+        if y < height - 2 and cells[current + steps[2]]:
+            neighbors.append(steps[2])
+        if x > 1 and cells[current + steps[3]]:
+            neighbors.append(steps[3])
+        if neighbors:
+            step = rng.choice(neighbors)
+            cells[current + step // 2] = 0
+            cells[current + step] = 0
+            stack.append(current + step)
+        else:
+            stack.pop()
+    return [list(cells[y * width:(y + 1) * width]) for y in range(height)]
+
+
+def bench_pathfinding(sizes, repeat, seed):
+    # A* over cells, then the corridor graph (build once, best query) and
+    # the cluster layer on top of it (first query fills the cluster tables)
+    print(f"{'size':>6} {'cells':>10} {'path':>8} {'best ms':>10} {'ns/(n log n)':>13} "
+          f"{'nodes':>8} {'index ms':>9} {'graph ms':>9} {'hpa cold':>9} {'hpa ms':>9}")
+    for size in sizes:
+        size |= 1  # odd sizes put the exit on a maze cell
+        grid = carve_maze(size, size, random.Random(seed))
+        start, goal = (1, 1), (size - 2, size - 2)
+        best = float('inf')
+        path = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            path = find_path(grid, size, size, start, goal)
+            best = min(best, time.perf_counter() - t0)
+        n = size * size
+        per_nlogn = best * 1e9 / (n * math.log2(n))
+
+        start_cell, goal_cell = size + 1, n - size - 2
+        t0 = time.perf_counter()
+        graph = CorridorGraph(flatten_grid(grid, size, size), size, size, (start_cell, goal_cell))
+        build = time.perf_counter() - t0
+        graph_best = float('inf')
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            graph.path(start_cell, goal_cell)
+            graph_best = min(graph_best, time.perf_counter() - t0)
+        clusters = ClusterLayer(graph)
+        hpa = []
+        for _ in range(repeat + 1):
+            t0 = time.perf_counter()
+            clusters.path(start_cell, goal_cell)
+            hpa.append(time.perf_counter() - t0)
+        print(f"{size:>6} {n:>10} {len(path):>8} {best * 1000:>10.1f} {per_nlogn:>13.2f} "
+              f"{len(graph.adjacent):>8} {build * 1000:>9.1f} {graph_best * 1000:>9.2f} "
+              f"{hpa[0] * 1000:>9.2f} {min(hpa[1:]) * 1000:>9.2f}")
+
+
+def measure(fn, repeat, setup=None):
+    # Median/p95 wall time in ms, plus peak traced memory of one extra run
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        'median_ms': statistics.median(times),
+        'p95_ms': times[min(len(times) - 1, int(len(times) * 0.95))],
+        'peak_kb': peak / 1024,
+        'runs': repeat,
+    }
+
+
+def bench_game(sizes, monster_counts, repeat, seed):
+    # The frame benchmark needs a display surface; the dummy driver needs no window
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import engine
+    import renderer
+
+    screen = renderer.init_display()
+    player_renderer = renderer.PlayerRenderer()
+    results = []
+
+    def record(name, size, monsters, stats):
+        row = dict(op=name, size=size, monsters=monsters, **stats)
+        results.append(row)
+        print(f"{name:<24} {size:>6} {monsters if monsters is not None else '':>7} "
+              f"{stats['median_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['peak_kb']:>10.1f}")
+
+    print(f"{'operation':<24} {'size':>6} {'monsters':>7} {'median ms':>10} {'p95 ms':>10} {'peak KB':>10}")
+    for size in sizes:
+        random.seed(seed)
+        # Huge mazes are slow to build, so fewer runs there
+        runs = max(1, min(repeat, repeat * 100 // size))
+        maze = engine.Maze(size, size, monster_count=0)
+
+        def regenerate():
+            maze.grid = maze.new_grid()
+            maze.generate_maze()
+        record('generate_maze', size, None, measure(regenerate, runs))
+        # Invalidate the cached distance field so the check solves the maze again
+        record('ensure_exit_reachable', size, None,
+               measure(maze.ensure_exit_reachable, repeat, setup=maze.mark_grid_changed))
+
+        def exit_distances():
+            maze.mark_grid_changed()
+            maze.exit_distances()
+        record('exit_distances', size, None, measure(exit_distances, repeat))
+
+        ai = engine.AI(maze)
+        record('find_path_to_exit', size, None, measure(ai.find_path_to_exit, repeat))
+
+        for count in monster_counts:
+            # List-of-dicts monsters, then the batched MonsterSwarm when numpy is there
+            for vectorized in ([False, True] if engine.np is not None else [False]):
+                suffix = '[soa]' if vectorized else ''
+                maze.vectorized_monsters = vectorized
+                maze.monsters = maze.new_monster_store()
+                maze.generate_monsters(count)
+                player = engine.Player(maze)
+                record('move_monsters' + suffix, size, count, measure(maze.move_monsters, repeat))
+
+                # Chase mode with the player moving every step, so every
+                # call pays for a flow field update
+                moves = [maze.start_pos, maze.step_toward_exit(*maze.start_pos)]
+
+                def chase_monsters():
+                    moves.reverse()
+                    maze.set_chase_target(*moves[0])
+                    maze.move_monsters()
+                maze.monster_mode = "chase"
+                record('chase_monsters' + suffix, size, count, measure(chase_monsters, repeat))
+                maze.monster_mode = "wander"
+                record('check_monster_collision' + suffix, size, count,
+                       measure(lambda: maze.check_monster_collision(player.x, player.y), repeat))
+
+                # One replanning AI move per monster step; the first plan is built untimed
+                replanning_ai = engine.ReplanningAI(maze)
+                replanning_ai.plan()
+                record('replanning_ai.move' + suffix, size, count,
+                       measure(replanning_ai.move, repeat, setup=maze.move_monsters))
+
+            maze_renderer = renderer.MazeRenderer(maze)
+            maze_renderer.draw(screen)  # build the cached layers outside the timing
+
+            def frame():
+                screen.fill(renderer.BG_COLOR)
+                offset_x, offset_y, scale = maze_renderer.draw(screen)
+                player_renderer.draw(screen, player, offset_x, offset_y, scale)
+            record('frame', size, count, measure(frame, repeat))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r['op'], r['size'], r['monsters']): r for r in baseline['results']}
+    print(f"\nvs {baseline_path} ({baseline.get('commit')}): median ratio, >1 is slower")
+    for row in results:
+        before = old.get((row['op'], row['size'], row['monsters']))
+        if before and before['median_ms'] > 0:
+            ratio = row['median_ms'] / before['median_ms']
+            flag = '  <-- regression' if ratio > 1.2 else ''
+            print(f"{row['op']:<24} {row['size']:>6} {row['monsters'] if row['monsters'] is not None else '':>7} "
+                  f"{ratio:>8.2f}x{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maze game benchmarks")
+    parser.add_argument('suite', choices=['pathfinding', 'game'])
+    parser.add_argument('--sizes', type=int, nargs='+')
+    parser.add_argument('--monsters', type=int, nargs='+', default=MONSTER_COUNTS)
+    parser.add_argument('--repeat', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="save results as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run")
+    args = parser.parse_args()
+
+    if args.suite == 'pathfinding':
+        bench_pathfinding(args.sizes or [125, 250, 500, 1000, 2000], args.repeat or 3, args.seed)
+        return
+
+    results = bench_game(args.sizes or GAME_SIZES, args.monsters, args.repeat or 20, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'seed': args.seed,
+                'results': results,
+            }, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
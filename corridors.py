@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+# Path index for big mazes (no pygame dependency).
+#
+# CorridorGraph contracts the grid: junctions, dead ends and the kept cells
+# (start, exit) are nodes, every corridor between two nodes is one weighted
+# edge holding its cells. ClusterLayer adds an HPA*-style level on top: the
+# graph nodes are grouped into square clusters, and only the portal nodes
+# (those with an edge into another cluster) take part in the top-level search.
+#
+# path() returns a route as a list of legs; walk(legs) expands it into cells
+# one leg at a time, so the cells of far-away corridors are only produced
+# when the walker gets there. update() applies one wall edit incrementally.
+import heapq
+from array import array
+
+from pathfinding import INF
+
+CLUSTER_SIZE = 32
+GOAL = -1  # virtual search node behind all goal attachments
+
+
+def search(sources, targets, neighbors, heuristic):
+    # A* with lazy deletion over graph nodes.
+    #   sources: [(node, cost, legs)], targets: {node: (cost, legs)}
+    #   neighbors(node) yields (node, cost, legs)
+    # Returns the legs of the cheapest source -> target route, or None.
+    g = {}
+    came_from = {}
+    heap = []
+    for node, cost, legs in sources:
+        if cost < g.get(node, INF):
+            g[node] = cost
+            came_from[node] = (None, legs)
+            heapq.heappush(heap, (cost + heuristic(node), cost, node))
+    while heap:
+        _, cost, node = heapq.heappop(heap)
+        if cost > g.get(node, INF):
+            continue
+        if node == GOAL:
+            route = []
+            while node is not None:
+                node, legs = came_from[node]
+                route.append(legs)
+            return [leg for legs in reversed(route) for leg in legs]
+        if node in targets:
+            extra, legs = targets[node]
+            if cost + extra < g.get(GOAL, INF):
+                g[GOAL] = cost + extra
+                came_from[GOAL] = (node, legs)
+                heapq.heappush(heap, (cost + extra, cost + extra, GOAL))
+        for next_node, step, legs in neighbors(node):
+            next_cost = cost + step
+            if next_cost < g.get(next_node, INF):
+                g[next_node] = next_cost
+                came_from[next_node] = (node, legs)
+                heapq.heappush(heap, (next_cost + heuristic(next_node), next_cost, next_node))
+    return None
+
+
+def cheapest(attachments):
+    # Targets dict for search(); a goal on a self-loop corridor attaches to
+    # the same node both ways round, and only the shorter way may count
+    targets = {}
+    for node, cost, legs in attachments:
+        if cost < targets.get(node, (INF,))[0]:
+            targets[node] = (cost, legs)
+    return targets
+
+
+class CorridorGraph:
+    # Cells are flat indices (y * width + x); `cells` is one byte per cell,
+    # 0 = path, 1 = wall (pathfinding.flatten_grid) and is owned by the graph
+    def __init__(self, cells, width, height, keep=()):
+        self.cells = cells
+        self.width = width
+        self.height = height
+        self.keep = set(keep)
+        self.is_node = bytearray(width * height)
+        # Corridor cell -> id of the edge it belongs to, -1 for nodes and walls
+        self.edge_of = array('i', [-1]) * (width * height)
+        # Edge id -> (node a, node b, interior cells from a to b)
+        self.edges = {}
+        self.adjacent = {}
+        self.next_edge = 0
+
+        nodes = []
+        for cell in range(width * height):
+            if cells[cell] == 0 and self.node_status(cell):
+                self.is_node[cell] = 1
+                self.adjacent[cell] = []
+                nodes.append(cell)
+        for node in nodes:
+            self.trace_from(node)
+
+    def open_neighbors(self, cell):
+        width = self.width
+        y, x = divmod(cell, width)
+        cells = self.cells
+        return [neighbor for neighbor, valid in ((cell - width, y > 0), (cell + 1, x < width - 1),
+                                                 (cell + width, y < self.height - 1), (cell - 1, x > 0))
+                if valid and cells[neighbor] == 0]
+
+    def node_status(self, cell):
+        return self.cells[cell] == 0 and (cell in self.keep or len(self.open_neighbors(cell)) != 2)
+
+    def other_end(self, edge, node):
+        a, b, _ = self.edges[edge]
+        return b if node == a else a
+
+    def edge_cost(self, edge):
+        return len(self.edges[edge][2]) + 1
+
+    def trace_from(self, node):
+        # Add the edges leaving `node` that do not exist yet
+        for first in self.open_neighbors(node):
+            if self.is_node[first]:
+                if not any(not self.edges[e][2] and self.other_end(e, node) == first
+                           for e in self.adjacent[node]):
+                    self.add_edge(node, first, [])
+                continue
+            if self.edge_of[first] != -1:
+                continue
+            interior = []
+            previous, current = node, first
+            while not self.is_node[current]:
+                interior.append(current)
+                a, b = self.open_neighbors(current)
+                previous, current = current, (b if a == previous else a)
+            self.add_edge(node, current, interior)
+
+    def add_edge(self, a, b, interior):
+        edge = self.next_edge
+        self.next_edge += 1
+        self.edges[edge] = (a, b, array('i', interior))
+        for cell in interior:
+            self.edge_of[cell] = edge
+        self.adjacent[a].append(edge)
+        if b != a:
+            self.adjacent[b].append(edge)
+
+    def remove_edge(self, edge):
+        a, b, interior = self.edges.pop(edge)
+        for cell in interior:
+            self.edge_of[cell] = -1
+        self.adjacent[a].remove(edge)
+        if b != a:
+            self.adjacent[b].remove(edge)
+        return a, b
+
+    def update(self, cell, wall):
+        # Set one cell to wall (1) or path (0). Only the cell and its
+        # neighbours can change status, so only edges through them or ending
+        # at them are rebuilt. Returns the nodes whose edges changed.
+        if self.cells[cell] == wall:
+            return set()
+        width = self.width
+        y, x = divmod(cell, width)
+        seeds = [cell] + [neighbor for neighbor, valid in (
+            (cell - width, y > 0), (cell + 1, x < width - 1),
+            (cell + width, y < self.height - 1), (cell - 1, x > 0)) if valid]
+
+        touched = set()
+        for seed in seeds:
+            if self.edge_of[seed] != -1:
+                touched.update(self.remove_edge(self.edge_of[seed]))
+            if self.is_node[seed]:
+                touched.add(seed)
+                for edge in list(self.adjacent[seed]):
+                    touched.update(self.remove_edge(edge))
+
+        self.cells[cell] = wall
+        for seed in seeds:
+            is_node = self.node_status(seed)
+            if self.is_node[seed] and not is_node:
+                del self.adjacent[seed]
+            elif is_node and not self.is_node[seed]:
+                self.adjacent[seed] = []
+                touched.add(seed)
+            self.is_node[seed] = is_node
+
+        for node in touched:
+            if self.is_node[node]:
+                self.trace_from(node)
+        return touched
+
+    def neighbors(self, node):
+        for edge in self.adjacent[node]:
+            yield self.other_end(edge, node), self.edge_cost(edge), [('edge', edge, node)]
+
+    def attach(self, cell, leaving):
+        # How `cell` connects to the graph: [(node, cost, legs)]. Leaving
+        # (a route start) the legs walk to the node, otherwise from it.
+        if self.cells[cell] != 0:
+            return []
+        if self.is_node[cell]:
+            return [(cell, 0, [])]
+        edge = self.edge_of[cell]
+        if edge == -1:
+            return []  # on a loop with no junction: cut off from every node
+        a, b, interior = self.edges[edge]
+        i = interior.index(cell)
+        if leaving:
+            return [(a, i + 1, [('cells', tuple(reversed(interior[:i])) + (a,))]),
+                    (b, len(interior) - i, [('cells', tuple(interior[i + 1:]) + (b,))])]
+        return [(a, i + 1, [('cells', tuple(interior[:i + 1]))]),
+                (b, len(interior) - i, [('cells', tuple(reversed(interior[i:])))])]
+
+    def direct(self, start, goal):
+        # (cost, legs) when start and goal lie on the same corridor
+        edge = self.edge_of[start]
+        if edge == -1 or edge != self.edge_of[goal]:
+            return None
+        interior = self.edges[edge][2]
+        i, j = interior.index(start), interior.index(goal)
+        cells = tuple(interior[i + 1:j + 1]) if j > i else tuple(reversed(interior[j:i]))
+        return len(cells), [('cells', cells)]
+
+    def heuristic_to(self, goal):
+        gy, gx = divmod(goal, self.width)
+
+        def heuristic(node):
+            if node == GOAL:
+                return 0
+            y, x = divmod(node, self.width)
+            return abs(x - gx) + abs(y - gy)
+        return heuristic
+
+    def route(self, start, goal, neighbors, sources=None, targets=None):
+        # Shared by path() and ClusterLayer.path()
+        if start == goal:
+            return []
+        sources = self.attach(start, True) if sources is None else sources
+        if targets is None:
+            targets = cheapest(self.attach(goal, False))
+        direct = self.direct(start, goal)
+        if direct:
+            # Walking straight along the corridor competes with going round
+            sources = sources + [(GOAL, direct[0], direct[1])]
+        return search(sources, targets, neighbors, self.heuristic_to(goal))
+
+    def path(self, start, goal):
+        # Legs from start to goal (cells), None when unreachable
+        return self.route(start, goal, self.neighbors)
+
+    def walk(self, legs):
+        # Cells of a route, start exclusive, produced leg by leg
+        for leg in legs:
+            if leg[0] == 'cells':
+                yield from leg[1]
+            else:
+                _, edge, node = leg
+                a, b, interior = self.edges[edge]
+                if node == a:
+                    yield from interior
+                    yield b
+                else:
+                    yield from reversed(interior)
+                    yield a
+
+
+class ClusterLayer:
+    # Top level of the hierarchy: portal-to-portal distances inside each
+    # cluster are computed on first use and dropped when an edit touches the
+    # cluster, so an update costs nothing until the next query there
+    def __init__(self, graph, cluster_size=CLUSTER_SIZE):
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.columns = (graph.width + cluster_size - 1) // cluster_size
+        # Cluster -> {portal: {other portal: distance}}
+        self.tables = {}
+
+    def cluster_of(self, node):
+        y, x = divmod(node, self.graph.width)
+        return (y // self.cluster_size) * self.columns + x // self.cluster_size
+
+    def is_portal(self, node):
+        cluster = self.cluster_of(node)
+        graph = self.graph
+        return any(self.cluster_of(graph.other_end(edge, node)) != cluster for edge in graph.adjacent[node])
+
+    def cluster_search(self, source, target=None):
+        # Dijkstra from source over the graph restricted to its cluster
+        graph = self.graph
+        cluster = self.cluster_of(source)
+        distances = {source: 0}
+        parents = {source: None}
+        heap = [(0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > distances[node]:
+                continue
+            if node == target:
+                break
+            for edge in graph.adjacent[node]:
+                other = graph.other_end(edge, node)
+                if self.cluster_of(other) != cluster:
+                    continue
+                next_distance = distance + graph.edge_cost(edge)
+                if next_distance < distances.get(other, INF):
+                    distances[other] = next_distance
+                    parents[other] = (node, edge)
+                    heapq.heappush(heap, (next_distance, other))
+        return distances, parents
+
+    def table(self, cluster):
+        if cluster not in self.tables:
+            graph = self.graph
+            size = self.cluster_size
+            y0, x0 = divmod(cluster, self.columns)
+            y0 *= size
+            x0 *= size
+            portals = [y * graph.width + x
+                       for y in range(y0, min(y0 + size, graph.height))
+                       for x in range(x0, min(x0 + size, graph.width))
+                       if graph.is_node[y * graph.width + x] and self.is_portal(y * graph.width + x)]
+            table = {}
+            for portal in portals:
+                distances, _ = self.cluster_search(portal)
+                table[portal] = {other: distances[other] for other in portals
+                                 if other != portal and other in distances}
+            self.tables[cluster] = table
+        return self.tables[cluster]
+
+    def update(self, cell, wall):
+        touched = self.graph.update(cell, wall)
+        for node in touched:
+            self.tables.pop(self.cluster_of(node), None)
+        return touched
+
+    def path(self, start, goal):
+        graph = self.graph
+        sources = graph.attach(start, True)
+        goal_nodes = graph.attach(goal, False)
+        # Start and goal nodes join the top level through their own cluster
+        # searches, which also link them when they share a cluster
+        local = {}
+        for node, _, _ in sources + goal_nodes:
+            if node not in local:
+                local[node] = self.cluster_search(node)[0]
+        goals = {node for node, _, _ in goal_nodes}
+
+        def neighbors(node):
+            cluster = self.cluster_of(node)
+            if node in local:
+                for other, distance in local[node].items():
+                    if other != node and (other in goals or self.is_portal(other)):
+                        yield other, distance, [('cluster', node, other)]
+            else:
+                for other, distance in self.table(cluster).get(node, {}).items():
+                    yield other, distance, [('cluster', node, other)]
+                for goal_node in goals:
+                    if self.cluster_of(goal_node) == cluster and node in local[goal_node]:
+                        yield goal_node, local[goal_node][node], [('cluster', node, goal_node)]
+            for edge in graph.adjacent[node]:
+                other = graph.other_end(edge, node)
+                if self.cluster_of(other) != cluster:
+                    yield other, graph.edge_cost(edge), [('edge', edge, node)]
+
+        return graph.route(start, goal, neighbors, sources, cheapest(goal_nodes))
+
+    def walk(self, legs):
+        graph = self.graph
+        for leg in legs:
+            if leg[0] != 'cluster':
+                yield from graph.walk([leg])
+                continue
+            # Refined only now: the cluster-local route between two nodes
+            _, node, target = leg
+            _, parents = self.cluster_search(node, target)
+            steps = []
+            while parents[target] is not None:
+                target, edge = parents[target]
+                steps.append(('edge', edge, target))
+            yield from graph.walk(reversed(steps))
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# Eller's algorithm: streams a perfect maze one grid row at a time using
+# O(width) working state. Cells sit on odd columns/rows like Maze.generate_maze.
+import random
+
+
+class EllerGenerator:
+    def __init__(self, width, seed=None, rng=None):
+        self.width = width
+        self.rng = rng if rng is not None else random.Random(seed)
+        self.columns = list(range(1, width, 2))
+        # Set id of every cell in the current row, None = not connected from above
+        self.sets = [None] * len(self.columns)
+        self.next_set = 0
+
+    def rows(self, height):
+        # Exactly `height` grid rows of a finished (perfect) maze
+        yield [1] * self.width
+        cell_rows = range(1, height, 2)
+        for y in cell_rows:
+            cell_row, below_row = self.next_rows(last=(y == cell_rows[-1]))
+            yield cell_row
+            if y + 1 < height:
+                yield below_row
+
+    def iter_rows(self):
+        # Endless stream of grid rows, for mazes extended on demand
+        yield [1] * self.width
+        while True:
+            cell_row, below_row = self.next_rows()
+            yield cell_row
+            yield below_row
+
+    def next_rows(self, last=False):
+        rng = self.rng
+        sets = self.sets
+        count = len(sets)
+        cell_row = [1] * self.width
+        below_row = [1] * self.width
+
+        for i in range(count):
+            if sets[i] is None:
+                sets[i] = self.next_set
+                self.next_set += 1
+            cell_row[self.columns[i]] = 0
+
+        # Randomly join neighbours from different sets (all of them on the last row)
+        parent = {}
+
+        def find(s):
+            root = s
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while s != root:
+                parent[s], s = root, parent.get(s, s)
+            return root
+
+        for i in range(count - 1):
+            a, b = find(sets[i]), find(sets[i + 1])
+            if a != b and (last or rng.random() < 0.5):
+                parent[b] = a
+                cell_row[self.columns[i] + 1] = 0
+        sets[:] = [find(s) for s in sets]
+
+        if last:
+            return cell_row, below_row
+
+        # Every set carries at least one passage down to the next row
+        down = [False] * count
+        start = 0
+        while start < count:
+            end = start
+            while end + 1 < count and sets[end + 1] == sets[start]:
+                end += 1
+            down[rng.randint(start, end)] = True
+            start = end + 1
+        # Cells of one set can be split across runs; extra random drops are fine
+        for i in range(count):
+            if not down[i] and rng.random() < 0.3:
+                down[i] = True
+
+        for i in range(count):
+            if down[i]:
+                below_row[self.columns[i]] = 0
+            else:
+                sets[i] = None
+        return cell_row, below_row
+
+
+class EndlessMaze:
+    # Rows are generated on first access; old rows can be dropped while scrolling
+    def __init__(self, width, seed=None, rng=None):
+        self.width = width
+        self.generator = EllerGenerator(width, seed, rng).iter_rows()
+        self.rows = []
+        self.first_row = 0
+
+    def row(self, y):
+        while y >= self.first_row + len(self.rows):
+            self.rows.append(next(self.generator))
+        return self.rows[y - self.first_row]
+
+    def cell(self, x, y):
+        return self.row(y)[x]
+
+    def discard_before(self, y):
+        drop = min(max(0, y - self.first_row), len(self.rows))
+        del self.rows[:drop]
+        self.first_row += drop
+
+
+def write_rows(fileobj, rows):
+    # One text line per grid row, '#' = wall, '.' = path
+    for row in rows:
+        fileobj.write(''.join('#' if cell else '.' for cell in row))
+        fileobj.write('\n')
+
+
+if __name__ == "__main__":
+    # python eller.py WIDTH HEIGHT [SEED] > maze.txt
+    import sys
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    write_rows(sys.stdout, EllerGenerator(int(sys.argv[1]), seed).rows(int(sys.argv[2])))
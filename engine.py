@@ -0,0 +1,691 @@
+# -*- coding: utf-8 -*-
+# Pure game logic: no pygame and no asset loading, so it can run headless
+import random
+import time
+from array import array
+from collections import deque
+
+from corridors import ClusterLayer, CorridorGraph
+from eller import EllerGenerator
+from pathfinding import DStarLite, FlowField, bfs_distances, flatten_grid
+
+try:
+    import numpy as np  # 可选：紧凑的迷宫网格和批量怪物
+    from monsters import MonsterSwarm
+except ImportError:
+    np = None
+    MonsterSwarm = None
+
+# Maze dimensions (kept large)
+MAZE_WIDTH = 30
+MAZE_HEIGHT = 30
+MONSTER_COUNT = 5
+
+# Simulation pacing, in frames
+FPS = 60
+MONSTER_MOVE_INTERVAL = 15  # Monsters move every 15 frames
+AI_MOVE_INTERVAL = 30
+# From this many cells the path index adds the cluster layer (corridors.py)
+CLUSTER_MIN_CELLS = 250 * 1000
+AI_SIGHT = 6  # Replanning AI sees monsters this many cells away
+MONSTER_PENALTY = 20  # Extra steps the replanning AI will walk to avoid a monster
+# Chasing monsters follow the player from this many steps away (None: from
+# anywhere). Each player move costs one BFS over the cells within the radius.
+CHASE_RADIUS = None
+MONSTER_MODES = ("wander", "chase")
+
+# Direction constants
+UP = 0
+RIGHT = 1
+DOWN = 2
+LEFT = 3
+
+
+class Maze:
+    def __init__(self, width, height, use_numpy=False, algorithm="dfs", monster_count=MONSTER_COUNT,
+                 vectorized_monsters=False, seed=None, grid=None, monster_mode="wander",
+                 chase_radius=CHASE_RADIUS):
+        self.width = width
+        self.height = height
+        # "dfs": recursive backtracker, "eller": row-by-row generator (eller.py)
+        self.algorithm = algorithm
+        # use_numpy stores the grid as one contiguous uint8 array (1 byte per
+        # cell); grid[y][x] reads and writes work the same for both backends
+        if (use_numpy or vectorized_monsters) and np is None:
+            raise ImportError("use_numpy / vectorized_monsters require numpy")
+        self.use_numpy = use_numpy
+        # vectorized_monsters keeps monsters in a MonsterSwarm (monsters.py):
+        # parallel arrays moved in batches, O(1) collision lookups
+        self.vectorized_monsters = vectorized_monsters
+        # "wander": monsters walk at random, "chase": monsters walk towards
+        # the chase target (the player) down one shared flow field. With a
+        # chase_radius only monsters within that many steps chase, the others
+        # wander, and the field costs O(radius^2) per update on any maze.
+        if monster_mode not in MONSTER_MODES:
+            raise ValueError(f"unknown monster mode {monster_mode!r}")
+        self.monster_mode = monster_mode
+        self.chase_radius = chase_radius
+        self.chase_target = None
+        # Everything random about this maze comes from its own generator, so
+        # the seed reproduces it; without one a seed is drawn from `random`
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.start_pos = (1, 1)
+        self.exit_pos = (width - 2, height - 2)
+
+        # Bumped whenever the grid changes so renderers can drop cached layers
+        self.grid_version = 0
+        self.distance_field = None
+        self.distance_field_version = None
+        self.path_graph = None
+        self.path_graph_version = None
+        self.chase_field = None
+        self.chase_field_version = None
+
+        # A given grid (e.g. from mazefile.load_maze) is used as is
+        self.source_file = None  # set by mazefile.load_maze
+        if grid is None:
+            self.grid = self.new_grid()
+            self.generate_maze()
+        else:
+            self.grid = grid
+
+        # Generate monsters - increased to 5
+        self.monsters = self.new_monster_store()
+        self.generate_monsters(monster_count)
+
+    def generate_maze(self):
+        if self.algorithm == "eller":
+            self.generate_rows()
+        else:
+            self.generate_dfs()
+
+        # Create multiple paths to exit
+        self.create_additional_paths()
+        self.mark_grid_changed()
+
+        # Ensure exit is reachable
+        self.ensure_exit_reachable()
+
+        # Distance field from the exit, shared by the AI and the HUD
+        self.exit_distances()
+
+    def generate_rows(self):
+        # Stream rows straight into the grid, O(width) working memory
+        rows = EllerGenerator(self.width, rng=self.rng).rows(self.height)
+        for y, row in enumerate(rows):
+            self.grid[y][:] = row
+
+    def generate_dfs(self):
+        # Use depth-first search to generate maze
+        stack = [self.start_pos]
+        visited = set([self.start_pos])
+
+        while stack:
+            x, y = stack[-1]
+            neighbors = []
+
+            # Check four directions
+            if y > 1 and (x, y - 2) not in visited:
+                neighbors.append((x, y - 2, UP))
+            if x < self.width - 2 and (x + 2, y) not in visited:
+                neighbors.append((x + 2, y, RIGHT))
+            if y < self.height - 2 and (x, y + 2) not in visited:
+                neighbors.append((x, y + 2, DOWN))
+            if x > 1 and (x - 2, y) not in visited:
+                neighbors.append((x - 2, y, LEFT))
+
+            if neighbors:
+                nx, ny, direction = self.rng.choice(neighbors)
+                # Break the wall
+                if direction == UP:
+                    self.grid[y - 1][x] = 0
+                elif direction == RIGHT:
+                    self.grid[y][x + 1] = 0
+                elif direction == DOWN:
+                    self.grid[y + 1][x] = 0
+                elif direction == LEFT:
+                    self.grid[y][x - 1] = 0
+
+                self.grid[ny][nx] = 0
+                visited.add((nx, ny))
+                stack.append((nx, ny))
+            else:
+                stack.pop()
+
+    def create_additional_paths(self):
+        # Create 3 additional exit paths
+        for _ in range(3):
+            side = self.rng.randint(0, 3)  # 0:top, 1:right, 2:bottom, 3:left
+            if side == 0:  # top
+                x = self.rng.randint(1, self.width - 2)
+                y = 0
+                self.set_wall(x, y + 1, 0)
+            elif side == 1:  # right
+                x = self.width - 1
+                y = self.rng.randint(1, self.height - 2)
+                self.set_wall(x - 1, y, 0)
+            elif side == 2:  # bottom
+                x = self.rng.randint(1, self.width - 2)
+                y = self.height - 1
+                self.set_wall(x, y - 1, 0)
+            else:  # left
+                x = 0
+                y = self.rng.randint(1, self.height - 2)
+                self.set_wall(x + 1, y, 0)
+
+    def ensure_exit_reachable(self):
+        # The exit's distance field tells at once whether start is connected
+        width, height = self.width, self.height
+        distances = self.exit_distances()
+        start = self.start_pos[1] * width + self.start_pos[0]
+        exit_index = self.exit_pos[1] * width + self.exit_pos[0]
+        if distances[start] >= 0:
+            return True
+
+        # Exit not reachable: instead of regenerating, carve the passage that
+        # breaks the fewest walls between the start and the exit's region.
+        # 0-1 BFS (open cell = 0, wall = 1) inside the outer border.
+        cells = flatten_grid(self.grid, width, height)
+        cost = array('i', [width * height]) * (width * height)
+        came_from = array('i', [-1]) * (width * height)
+        cost[start] = cells[start]
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if distances[current] >= 0 or current == exit_index:
+                break
+            y, x = divmod(current, width)
+            for neighbor, valid in ((current - width, y > 1), (current + 1, x < width - 2),
+                                    (current + width, y < height - 2), (current - 1, x > 1)):
+                if valid and cost[current] + cells[neighbor] < cost[neighbor]:
+                    cost[neighbor] = cost[current] + cells[neighbor]
+                    came_from[neighbor] = current
+                    if cells[neighbor]:
+                        queue.append(neighbor)
+                    else:
+                        queue.appendleft(neighbor)
+
+        while current != -1:
+            y, x = divmod(current, width)
+            self.set_wall(x, y, 0)
+            current = came_from[current]
+        # The exit cell itself may have been a wall
+        self.set_wall(self.exit_pos[0], self.exit_pos[1], 0)
+        return True
+
+    def exit_distances(self):
+        # BFS steps to the exit for every cell (flat, index = y * width + x,
+        # -1 = unreachable); recomputed only after the grid changes
+        if self.distance_field_version != self.grid_version:
+            cells = flatten_grid(self.grid, self.width, self.height)
+            exit_index = self.exit_pos[1] * self.width + self.exit_pos[0]
+            self.distance_field = bfs_distances(cells, self.width, self.height, exit_index)
+            self.distance_field_version = self.grid_version
+        return self.distance_field
+
+    def path_index(self):
+        # Corridor graph of the maze (with the cluster layer on big mazes),
+        # built on first use and kept in step with set_wall() edits
+        if self.path_graph_version != self.grid_version:
+            cells = flatten_grid(self.grid, self.width, self.height)
+            keep = [self.start_pos[1] * self.width + self.start_pos[0],
+                    self.exit_pos[1] * self.width + self.exit_pos[0]]
+            self.path_graph = CorridorGraph(cells, self.width, self.height, keep)
+            if self.width * self.height >= CLUSTER_MIN_CELLS:
+                self.path_graph = ClusterLayer(self.path_graph)
+            self.path_graph_version = self.grid_version
+        return self.path_graph
+
+    def set_chase_target(self, x, y):
+        self.chase_target = y * self.width + x
+
+    def flow_field(self):
+        # Shared chase field towards the chase target; the BFS reruns only
+        # when the target has moved since the last call (or the grid changed)
+        if self.chase_field_version != self.grid_version:
+            cells = flatten_grid(self.grid, self.width, self.height)
+            self.chase_field = FlowField(cells, self.width, self.height, self.chase_radius)
+            self.chase_field_version = self.grid_version
+        if self.chase_target is not None:
+            self.chase_field.update(self.chase_target)
+        return self.chase_field
+
+    def set_wall(self, x, y, wall):
+        # Edit one cell; an up-to-date path index is updated incrementally
+        if self.grid[y][x] == wall:
+            return
+        self.grid[y][x] = wall
+        index_current = self.path_graph_version == self.grid_version
+        self.mark_grid_changed()
+        if index_current:
+            self.path_graph.update(y * self.width + x, wall)
+            self.path_graph_version = self.grid_version
+
+    def distance_to_exit(self, x, y):
+        return self.exit_distances()[y * self.width + x]
+
+    def step_toward_exit(self, x, y):
+        # Neighbour one step closer to the exit, None at the exit or if cut off
+        distances = self.exit_distances()
+        d = distances[y * self.width + x]
+        if d <= 0:
+            return None
+        for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+            if 0 <= nx < self.width and 0 <= ny < self.height and \
+                    distances[ny * self.width + nx] == d - 1:
+                return nx, ny
+        return None
+
+    def path_to_exit(self, x, y):
+        path = []
+        step = self.step_toward_exit(x, y)
+        while step:
+            path.append(step)
+            step = self.step_toward_exit(*step)
+        return path
+
+    def new_grid(self):
+        # All walls
+        if self.use_numpy:
+            return np.ones((self.height, self.width), dtype=np.uint8)
+        return [[1 for _ in range(self.width)] for _ in range(self.height)]
+
+    def grid_array(self):
+        # numpy view of the grid (a copy for the list backend)
+        if self.use_numpy:
+            return self.grid
+        return np.array(self.grid, dtype=np.uint8)
+
+    def wall_mask(self):
+        return self.grid_array() == 1
+
+    def wall_count(self):
+        return int(np.count_nonzero(self.grid_array()))
+
+    def dead_ends(self):
+        # Path cells with exactly one open neighbour
+        open_cells = np.pad(self.grid_array() == 0, 1)
+        neighbors = (open_cells[:-2, 1:-1].astype(np.uint8) + open_cells[2:, 1:-1] +
+                     open_cells[1:-1, :-2] + open_cells[1:-1, 2:])
+        ys, xs = np.nonzero(open_cells[1:-1, 1:-1] & (neighbors == 1))
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def packed_grid(self):
+        # 1 bit per cell, row-major; np.unpackbits(...)[:width * height] restores it
+        return np.packbits(self.grid_array(), axis=None)
+
+    def new_monster_store(self):
+        if self.vectorized_monsters:
+            return MonsterSwarm(self, seed=self.rng.getrandbits(64))
+        return []
+
+    def generate_monsters(self, count):
+        if self.vectorized_monsters:
+            # Ensure monster is on path and not near start/exit
+            ys, xs = np.nonzero(self.grid_array() == 0)
+            far = (np.abs(xs - self.start_pos[0]) + np.abs(ys - self.start_pos[1]) > 10)
+            far &= (xs != self.exit_pos[0]) | (ys != self.exit_pos[1])
+            far &= (xs >= 1) & (xs <= self.width - 2) & (ys >= 1) & (ys <= self.height - 2)
+            self.monsters.spawn(count, xs[far], ys[far])
+            return
+
+        for _ in range(count):
+            while True:
+                x = self.rng.randint(1, self.width - 2)
+                y = self.rng.randint(1, self.height - 2)
+                # Ensure monster is on path and not near start/exit
+                if (self.grid[y][x] == 0 and
+                        (x, y) != self.start_pos and
+                        (x, y) != self.exit_pos and
+                        abs(x - self.start_pos[0]) + abs(y - self.start_pos[1]) > 10):
+                    self.monsters.append({
+                        'x': x,
+                        'y': y,
+                        'speed': self.rng.randint(1, 2),
+                        'direction': self.rng.randint(0, 3)
+                    })
+                    break
+
+    def place_monsters(self, positions):
+        # Monsters on the given (x, y) cells, e.g. spawns read from a maze file
+        speeds = [self.rng.randint(1, 2) for _ in positions]
+        directions = [self.rng.randint(0, 3) for _ in positions]
+        if self.vectorized_monsters:
+            self.monsters.add([x for x, _ in positions], [y for _, y in positions], speeds, directions)
+            return
+        for (x, y), speed, direction in zip(positions, speeds, directions):
+            self.monsters.append({'x': x, 'y': y, 'speed': speed, 'direction': direction})
+
+    def monster_positions(self):
+        if self.vectorized_monsters:
+            return list(zip(self.monsters.xs.tolist(), self.monsters.ys.tolist()))
+        return [(monster['x'], monster['y']) for monster in self.monsters]
+
+    def mark_grid_changed(self):
+        # Call after editing self.grid directly
+        self.grid_version += 1
+
+    def move_monsters(self):
+        field = self.flow_field() if self.monster_mode == "chase" else None
+        if self.vectorized_monsters:
+            self.monsters.move(field)
+            return
+
+        for monster in self.monsters:
+            if field is not None:
+                # In range: walk down the field, one cell per point of speed
+                cell = monster['y'] * self.width + monster['x']
+                if field.distances[cell] > 0:
+                    for _ in range(monster['speed']):
+                        cell = field.step(cell)
+                        if cell is None:
+                            break
+                        monster['y'], monster['x'] = divmod(cell, self.width)
+                    continue
+
+            # 10% chance to change direction
+            if self.rng.random() < 0.1:
+                monster['direction'] = self.rng.randint(0, 3)
+
+            # Attempt to move
+            for _ in range(monster['speed']):
+                new_x, new_y = monster['x'], monster['y']
+
+                if monster['direction'] == UP:
+                    new_y -= 1
+                elif monster['direction'] == RIGHT:
+                    new_x += 1
+                elif monster['direction'] == DOWN:
+                    new_y += 1
+                elif monster['direction'] == LEFT:
+                    new_x -= 1
+
+                # Check if can move
+                if (0 <= new_x < self.width and 0 <= new_y < self.height and
+                        self.grid[new_y][new_x] == 0):
+                    monster['x'], monster['y'] = new_x, new_y
+                else:
+                    # Hit wall, change direction
+                    monster['direction'] = self.rng.randint(0, 3)
+
+    def check_monster_collision(self, player_x, player_y):
+        if self.vectorized_monsters:
+            return self.monsters.occupied(player_x, player_y)
+
+        for monster in self.monsters:
+            if monster['x'] == player_x and monster['y'] == player_y:
+                return True
+        return False
+
+    def monsters_near(self, x, y, radius):
+        # Cells (index = y * width + x) holding a monster within `radius`
+        if self.vectorized_monsters:
+            return self.monsters.near(x, y, radius)
+        return {monster['y'] * self.width + monster['x'] for monster in self.monsters
+                if abs(monster['x'] - x) <= radius and abs(monster['y'] - y) <= radius}
+
+
+class Player:
+    def __init__(self, maze, clock=time.time):
+        self.x = maze.start_pos[0]
+        self.y = maze.start_pos[1]
+        # Position before the last Game.step, for render interpolation
+        self.prev_x, self.prev_y = self.x, self.y
+        self.maze = maze
+        self.steps = 0
+        self.lives = 3
+        self.invincible = False
+        self.invincible_start_time = 0
+        self.invincible_duration = 2  # 2 seconds invincibility
+        # Time source in seconds; Game passes its frame clock
+        self.clock = clock
+
+    def move(self, direction):
+        new_x, new_y = self.x, self.y
+
+        if direction == UP:
+            new_y -= 1
+        elif direction == RIGHT:
+            new_x += 1
+        elif direction == DOWN:
+            new_y += 1
+        elif direction == LEFT:
+            new_x -= 1
+
+        if 0 <= new_x < self.maze.width and 0 <= new_y < self.maze.height:
+            if self.maze.grid[new_y][new_x] == 0:
+                self.x, self.y = new_x, new_y
+                self.steps += 1
+
+                # Check monster collision
+                if self.maze.check_monster_collision(self.x, self.y):
+                    if not self.invincible:
+                        self.hit()
+                        return "hit"
+                return True
+        return False
+
+    def hit(self):
+        self.lives -= 1
+        self.invincible = True
+        self.invincible_start_time = self.clock()
+
+    def update(self):
+        # Update invincibility status
+        if self.invincible and self.clock() - self.invincible_start_time > self.invincible_duration:
+            self.invincible = False
+
+    def is_at_exit(self):
+        return (self.x, self.y) == self.maze.exit_pos
+
+
+class AI:
+    def __init__(self, maze):
+        self.x = maze.start_pos[0]
+        self.y = maze.start_pos[1]
+        self.prev_x, self.prev_y = self.x, self.y
+        self.maze = maze
+        self.steps = 0
+        self.move_timer = 0
+        self.move_interval = AI_MOVE_INTERVAL
+
+    def find_path_to_exit(self):
+        # Full remaining route, read off the maze's distance field
+        return self.maze.path_to_exit(self.x, self.y)
+
+    def move(self):
+        # Walk down the distance field: O(1) per step from any cell, so a
+        # displaced AI needs no new search
+        next_pos = self.maze.step_toward_exit(self.x, self.y)
+        if next_pos:
+            self.x, self.y = next_pos
+            self.steps += 1
+            return True
+        return False
+
+    def update(self):
+        self.move_timer += 1
+        if self.move_timer >= self.move_interval and not self.is_at_exit():
+            self.move()
+            self.move_timer = 0
+
+    def is_at_exit(self):
+        return (self.x, self.y) == self.maze.exit_pos
+
+
+class ReplanningAI(AI):
+    # Steers around the monsters it can see. D* Lite keeps its plan between
+    # moves; a monster coming into or out of sight only changes the cost of
+    # entering its cell, so each move repairs the plan locally instead of
+    # searching again.
+    def __init__(self, maze, sight=AI_SIGHT, penalty=MONSTER_PENALTY):
+        super().__init__(maze)
+        self.sight = sight
+        self.penalty = penalty
+        self.planner = None
+        self.planner_version = None
+        self.seen = set()
+
+    def plan(self):
+        maze = self.maze
+        here = self.y * maze.width + self.x
+        if self.planner_version != maze.grid_version:
+            cells = flatten_grid(maze.grid, maze.width, maze.height)
+            exit_index = maze.exit_pos[1] * maze.width + maze.exit_pos[0]
+            self.planner = DStarLite(cells, maze.width, maze.height, here, exit_index,
+                                     maze.exit_distances())
+            self.planner_version = maze.grid_version
+            self.seen = set()
+        planner = self.planner
+        if planner.start != here:
+            planner.move_to(here)
+
+        seen = maze.monsters_near(self.x, self.y, self.sight)
+        for cell in seen ^ self.seen:
+            planner.set_penalty(cell, self.penalty if cell in seen else 0)
+        self.seen = seen
+        planner.compute()
+        return planner
+
+    def find_path_to_exit(self):
+        width = self.maze.width
+        return [(cell % width, cell // width) for cell in self.plan().path()]
+
+    def move(self):
+        step = self.plan().next_step()
+        if step is None:
+            return False
+        self.y, self.x = divmod(step, self.maze.width)
+        self.steps += 1
+        return True
+
+
+class GraphAI(AI):
+    # Plans on the maze's path index (corridor graph / cluster layer) and
+    # expands the plan into cells only as it walks it. Replans when the grid
+    # changed or the AI was moved.
+    def __init__(self, maze):
+        super().__init__(maze)
+        self.route = None
+        self.route_version = None
+        self.route_cell = None
+
+    def plan(self):
+        maze = self.maze
+        index = maze.path_index()
+        here = self.y * maze.width + self.x
+        legs = index.path(here, maze.exit_pos[1] * maze.width + maze.exit_pos[0])
+        return index.walk(legs) if legs is not None else iter(())
+
+    def find_path_to_exit(self):
+        width = self.maze.width
+        return [(cell % width, cell // width) for cell in self.plan()]
+
+    def move(self):
+        maze = self.maze
+        here = self.y * maze.width + self.x
+        if self.route_version != maze.grid_version or self.route_cell != here:
+            self.route = self.plan()
+            self.route_version = maze.grid_version
+        step = next(self.route, None)
+        if step is None:
+            return False
+        self.y, self.x = divmod(step, maze.width)
+        self.route_cell = step
+        self.steps += 1
+        return True
+
+
+# Versus opponents, picked with Game(ai_mode=...)
+AI_MODES = {"field": AI, "dstar": ReplanningAI, "graph": GraphAI}
+
+
+class Game:
+    # One game of maze + player (+ AI in versus mode), advanced one frame at a
+    # time. Time is counted in frames, so a headless run is independent of the
+    # wall clock:
+    #   game = Game("versus")
+    #   while game.step(RIGHT) == "playing": ...
+    def __init__(self, mode="single", width=MAZE_WIDTH, height=MAZE_HEIGHT, ai_mode="field", maze=None,
+                 **maze_options):
+        self.mode = mode
+        self.ai_mode = ai_mode
+        self.frame = 0
+        # Optional replay.ReplayWriter that records every move made by step()
+        self.replay = None
+        # maze: a ready Maze (e.g. loaded from a file) instead of a new one
+        self.maze = maze if maze is not None else Maze(width, height, **maze_options)
+        self.player = Player(self.maze, clock=self.clock)
+        # Chasing monsters (monster_mode="chase") go after the player
+        self.maze.set_chase_target(self.player.x, self.player.y)
+        self.ai = AI_MODES[ai_mode](self.maze) if mode == "versus" else None
+        self.monster_move_timer = 0
+        self.game_over = False
+        self.win = False
+
+    def clock(self):
+        return self.frame / FPS
+
+    def move_player(self, direction):
+        if self.game_over:
+            return False
+        result = self.player.move(direction)
+        self.maze.set_chase_target(self.player.x, self.player.y)
+        if result == "hit":
+            if self.player.lives <= 0:
+                self.game_over = True
+                self.win = False
+        elif result:
+            if self.player.is_at_exit():
+                self.game_over = True
+                self.win = True
+        return result
+
+    def tick(self, mark=None):
+        # mark(phase) is an optional profiler hook called after each phase
+        if self.game_over:
+            return
+        self.frame += 1
+        self.monster_move_timer += 1
+        if self.monster_move_timer >= MONSTER_MOVE_INTERVAL:
+            self.maze.move_monsters()
+            self.monster_move_timer = 0
+
+            if self.maze.check_monster_collision(self.player.x, self.player.y) and not self.player.invincible:
+                self.player.hit()
+                if self.player.lives <= 0:
+                    self.game_over = True
+                    self.win = False
+        if mark:
+            mark('move_monsters')
+
+        self.player.update()
+        if self.ai:
+            self.ai.update()
+            if self.ai.is_at_exit():
+                self.game_over = True
+                self.win = False
+        if mark:
+            mark('ai.update')
+
+    def step(self, direction=None, mark=None):
+        # Optional player move, then one tick of simulation. Positions before
+        # the step are kept so a renderer can interpolate between ticks.
+        for entity in (self.player, self.ai):
+            if entity:
+                entity.prev_x, entity.prev_y = entity.x, entity.y
+        if direction is not None:
+            if self.replay and not self.game_over:
+                self.replay.record(self.frame, direction)
+            self.move_player(direction)
+        self.tick(mark)
+        return self.status()
+
+    def status(self):
+        if not self.game_over:
+            return "playing"
+        return "win" if self.win else "lose"
+
+    def lost_to_ai(self):
+        return self.ai is not None and self.ai.is_at_exit()
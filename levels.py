@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Upcoming levels are generated and solved on a worker thread while the
+# current game runs, so starting a new game just takes a ready maze.
+import queue
+import threading
+
+# Ready mazes kept waiting; the worker sleeps while the queue is full
+LEVEL_QUEUE_SIZE = 2
+
+
+class LevelQueue:
+    def __init__(self, factory, size=LEVEL_QUEUE_SIZE):
+        # factory() builds one Maze; it runs on the worker thread only
+        self.factory = factory
+        self.ready = queue.Queue(maxsize=size)
+        self.thread = threading.Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def fill(self):
+        while True:
+            try:
+                maze = self.factory()
+                # Solve it too: the distance field drives the AI and the HUD
+                maze.exit_distances()
+            except Exception as error:
+                # Handed to take(), which raises it in the game thread
+                self.ready.put(error)
+                return
+            self.ready.put(maze)
+
+    def take(self):
+        # Blocks only when the worker has not caught up yet
+        maze = self.ready.get()
+        if isinstance(maze, Exception):
+            raise maze
+        return maze
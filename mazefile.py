@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Compact binary maze files: a fixed header, the monster spawns, then the grid
+# with one bit per cell (1 = wall, most significant bit first), each row
+# padded to whole bytes. load_maze maps the file instead of reading it, so a
+# huge maze opens at once and only the rows that are used get decoded.
+#   python mazefile.py OUT_DIR [--count 100] [--size 301 | 800x600] [--seed 0]
+import argparse
+import mmap
+import os
+import struct
+
+from engine import MONSTER_COUNT, Maze, np
+
+MAGIC = b'MAZE'
+VERSION = 1
+# magic, version, flags, width, height, start x/y, exit x/y, seed, monster count
+HEADER = struct.Struct('<4sHHIIIIIIQI')
+SPAWN = struct.Struct('<II')
+
+TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+FROM_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def pack_row(row):
+    bits = bytes(row)
+    bits += bytes(-len(bits) % 8)
+    return int(bits.translate(TO_DIGITS), 2).to_bytes(len(bits) // 8, 'big')
+
+
+def unpack_row(data, width):
+    digits = format(int.from_bytes(data, 'big'), '0%db' % (len(data) * 8)).encode()
+    return bytearray(digits[:width].translate(FROM_DIGITS))
+
+
+class PackedGrid:
+    # grid[y][x] over bit-packed rows in a buffer (an mmap). A row is
+    # unpacked into a bytearray the first time it is used; edits stay in
+    # memory and never reach the file.
+    def __init__(self, buffer, offset, width, height):
+        self.buffer = buffer
+        self.offset = offset
+        self.width = width
+        self.height = height
+        self.stride = (width + 7) // 8
+        self.rows = {}
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        row = self.rows.get(y)
+        if row is None:
+            if not 0 <= y < self.height:
+                raise IndexError(y)
+            start = self.offset + y * self.stride
+            row = self.rows[y] = unpack_row(self.buffer[start:start + self.stride], self.width)
+        return row
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield self[y]
+
+    def __array__(self, dtype=None, copy=None):
+        # Whole grid as a (height, width) uint8 array, decoded in one go
+        packed = np.frombuffer(self.buffer, np.uint8, self.stride * self.height, self.offset)
+        grid = np.unpackbits(packed.reshape(self.height, self.stride), axis=1)[:, :self.width]
+        grid = np.ascontiguousarray(grid)
+        for y, row in self.rows.items():
+            grid[y] = np.frombuffer(row, np.uint8)
+        return grid if dtype is None else grid.astype(dtype, copy=False)
+
+    def tobytes(self):
+        # Used by pathfinding.flatten_grid
+        if np is not None:
+            return self.__array__().tobytes()
+        return b''.join(bytes(row) for row in self)
+
+
+def save_maze(maze, path):
+    spawns = maze.monster_positions()
+    # Write to a temporary file first so a reader never sees half a maze
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, maze.width, maze.height,
+                            maze.start_pos[0], maze.start_pos[1], maze.exit_pos[0], maze.exit_pos[1],
+                            maze.seed, len(spawns)))
+        for x, y in spawns:
+            f.write(SPAWN.pack(x, y))
+        if maze.use_numpy:
+            f.write(np.packbits(maze.grid, axis=1).tobytes())
+        else:
+            for row in maze.grid:
+                f.write(pack_row(row))
+    os.replace(tmp_path, path)
+
+
+def load_maze(path, use_numpy=False, vectorized_monsters=False, monster_mode="wander", chase_radius=None):
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"{path}: not a maze file")
+    (magic, version, _, width, height, start_x, start_y, exit_x, exit_y,
+     seed, monster_count) = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a maze file (version {VERSION})")
+    grid_offset = HEADER.size + monster_count * SPAWN.size
+    if len(buffer) < grid_offset + (width + 7) // 8 * height:
+        raise ValueError(f"{path}: truncated")
+
+    grid = PackedGrid(buffer, grid_offset, width, height)
+    if use_numpy:
+        grid = grid.__array__()
+    maze = Maze(width, height, use_numpy=use_numpy, monster_count=0,
+                vectorized_monsters=vectorized_monsters, seed=seed, grid=grid,
+                monster_mode=monster_mode, chase_radius=chase_radius)
+    maze.start_pos = (start_x, start_y)
+    maze.exit_pos = (exit_x, exit_y)
+    maze.source_file = path
+    maze.place_monsters([SPAWN.unpack_from(buffer, HEADER.size + i * SPAWN.size)
+                         for i in range(monster_count)])
+    return maze
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate a library of maze files")
+    parser.add_argument('out_dir')
+    parser.add_argument('--count', type=int, default=10)
+    parser.add_argument('--size', default='31', help="W or WxH")
+    parser.add_argument('--seed', type=int, default=0, help="first seed, then seed + 1, ...")
+    parser.add_argument('--algorithm', choices=['dfs', 'eller'], default='dfs')
+    parser.add_argument('--monsters', type=int, default=MONSTER_COUNT)
+    parser.add_argument('--numpy', action='store_true', help="build with the numpy grid")
+    args = parser.parse_args()
+
+    width, _, height = args.size.lower().partition('x')
+    width = int(width)
+    height = int(height) if height else width
+    os.makedirs(args.out_dir, exist_ok=True)
+    for seed in range(args.seed, args.seed + args.count):
+        maze = Maze(width, height, use_numpy=args.numpy, algorithm=args.algorithm,
+                    monster_count=args.monsters, seed=seed)
+        path = os.path.join(args.out_dir, f"{width}x{height}-{seed}.maze")
+        save_maze(maze, path)
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Monsters as parallel NumPy arrays, moved in batches. Used by
+# Maze(vectorized_monsters=True); needs numpy.
+import numpy as np
+
+# Step per direction, indexed by engine.UP / RIGHT / DOWN / LEFT
+DIRECTION_DX = np.array([0, 1, 0, -1], dtype=np.int32)
+DIRECTION_DY = np.array([-1, 0, 1, 0], dtype=np.int32)
+
+
+class MonsterSwarm:
+    # Positions are flat indices into the grid padded with one ring of walls
+    # (index = (y + 1) * stride + x + 1), so a move is one add and a
+    # walkability test is one gather, with no bounds checks
+    def __init__(self, maze, seed=None):
+        self.maze = maze
+        self.rng = np.random.default_rng(seed)
+        self.stride = maze.width + 2
+        self.offsets = DIRECTION_DY * self.stride + DIRECTION_DX
+        self.cells = np.empty(0, dtype=np.int32)
+        self.directions = np.empty(0, dtype=np.int32)
+        self.speeds = np.empty(0, dtype=np.int32)
+        # Occupancy grid: a cell holds a monster when its stamp equals the
+        # current stamp, so refreshing it is one scatter and a collision test
+        # is one lookup. Stamps start at 1 so the zeroed grid holds no monsters.
+        self.occupancy = np.zeros((maze.height + 2) * self.stride, dtype=np.int32)
+        self.stamp = 1
+        self.open_cells = None
+        self.grid_version = None
+        # Padded copy of the maze's chase FlowField (-1 = out of range), kept
+        # in step by rewriting only the cells its searches reach
+        self.chase = None
+        self.chase_cells = np.empty(0, dtype=np.int64)
+        self.chase_version = None
+
+    @property
+    def xs(self):
+        return self.cells % self.stride - 1
+
+    @property
+    def ys(self):
+        return self.cells // self.stride - 1
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        # Dict view of each monster, same keys as the list-of-dicts backend
+        for x, y, speed, direction in zip(self.xs.tolist(), self.ys.tolist(),
+                                          self.speeds.tolist(), self.directions.tolist()):
+            yield {'x': x, 'y': y, 'speed': speed, 'direction': direction}
+
+    def add(self, xs, ys, speeds, directions):
+        cells = (np.asarray(ys, dtype=np.int32) + 1) * self.stride + np.asarray(xs, dtype=np.int32) + 1
+        self.cells = np.concatenate([self.cells, cells])
+        self.speeds = np.concatenate([self.speeds, np.asarray(speeds, dtype=np.int32)])
+        self.directions = np.concatenate([self.directions, np.asarray(directions, dtype=np.int32)])
+        self.refresh_occupancy()
+
+    def spawn(self, count, candidates_x, candidates_y):
+        # Random spawn cells (with replacement) from the candidate lists
+        picks = self.rng.integers(0, len(candidates_x), count)
+        self.add(candidates_x[picks], candidates_y[picks],
+                 self.rng.integers(1, 3, count), self.rng.integers(0, 4, count))
+
+    def walkable(self):
+        # Flat padded open-cell mask, rebuilt only when the grid changes
+        if self.grid_version != self.maze.grid_version or self.open_cells is None:
+            self.open_cells = np.pad(self.maze.grid_array() == 0, 1).ravel()
+            self.grid_version = self.maze.grid_version
+        return self.open_cells
+
+    def sync_chase(self, field):
+        if self.chase is None:
+            self.chase = np.full(len(self.occupancy), -1, dtype=np.int32)
+        if self.chase_version == (field, field.version):
+            return self.chase
+        self.chase[self.chase_cells] = -1
+        reached = np.array(field.reached, dtype=np.int64)
+        width = self.maze.width
+        self.chase_cells = (reached // width + 1) * self.stride + reached % width + 1
+        self.chase[self.chase_cells] = np.frombuffer(field.distances, dtype=np.int32)[reached]
+        self.chase_version = (field, field.version)
+        return self.chase
+
+    def move(self, field=None):
+        # field: the maze's chase FlowField; monsters in its range walk down
+        # it and the rest wander
+        count = len(self.cells)
+        if not count:
+            return
+        open_cells = self.walkable()
+        rng = self.rng
+        cells = self.cells
+        wandering = None
+        if field is not None:
+            chase = self.sync_chase(field)
+            chasing = np.nonzero(chase[cells] > 0)[0]
+            if len(chasing):
+                self.chase_step(chase, chasing)
+                wandering = np.ones(count, dtype=bool)
+                wandering[chasing] = False
+
+        # 10% chance to change direction
+        turn = rng.random(count) < 0.1
+        if wandering is not None:
+            turn &= wandering
+        self.directions[turn] = rng.integers(0, 4, int(turn.sum()))
+
+        # Attempt to move, one sub-step per point of speed
+        for step in range(int(self.speeds.max())):
+            active = self.speeds > step
+            if wandering is not None:
+                active &= wandering
+            new_cells = cells + self.offsets[self.directions]
+            can_move = open_cells[new_cells]
+            can_move &= active
+            np.copyto(cells, new_cells, where=can_move)
+            # Hit wall, change direction
+            active &= ~can_move
+            self.directions[active] = rng.integers(0, 4, int(active.sum()))
+        self.refresh_occupancy()
+
+    def chase_step(self, chase, chasing):
+        # Each sub-step moves every chaser to its first neighbour one step
+        # closer: a (chasers, 4) gather, no per-monster search
+        cells = self.cells[chasing]
+        speeds = self.speeds[chasing]
+        for step in range(int(speeds.max())):
+            neighbors = cells[:, None] + self.offsets[None, :]
+            downhill = chase[neighbors] == (chase[cells] - 1)[:, None]
+            can_move = downhill.any(axis=1) & (speeds > step) & (chase[cells] > 0)
+            best = neighbors[np.arange(len(cells)), downhill.argmax(axis=1)]
+            np.copyto(cells, best, where=can_move)
+        self.cells[chasing] = cells
+
+    def refresh_occupancy(self):
+        self.stamp += 1
+        self.occupancy[self.cells] = self.stamp
+
+    def near(self, x, y, radius):
+        # Flat unpadded indices (y * width + x) of monsters within `radius`
+        # cells on both axes
+        xs, ys = self.xs, self.ys
+        inside = (np.abs(xs - x) <= radius) & (np.abs(ys - y) <= radius)
+        return set((ys[inside] * self.maze.width + xs[inside]).tolist())
+
+    def occupied(self, x, y):
+        return (0 <= x < self.maze.width and 0 <= y < self.maze.height and
+                self.occupancy[(y + 1) * self.stride + x + 1] == self.stamp)
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+# Grid pathfinding shared by the AI and tools (no pygame dependency)
+import heapq
+from array import array
+
+INF = 2 ** 31 - 1
+
+
+def flatten_grid(grid, width, height):
+    # One byte per cell indexed by y * width + x, 0 = path, 1 = wall
+    if hasattr(grid, 'tobytes'):  # numpy uint8 grid
+        return bytearray(grid.tobytes())
+    cells = bytearray(width * height)
+    for y in range(height):
+        cells[y * width:(y + 1) * width] = bytes(grid[y])
+    return cells
+
+
+def find_path(grid, width, height, start, goal, cells=None):
+    # A* with a binary-heap open set and lazy deletion: stale heap entries are
+    # skipped when popped instead of being removed. Returns the cells from
+    # start (exclusive) to goal (inclusive), or [] if the goal is unreachable.
+    if cells is None:
+        cells = flatten_grid(grid, width, height)
+
+    gx, gy = goal
+    start_index = start[1] * width + start[0]
+    goal_index = gy * width + gx
+    if start_index == goal_index or cells[goal_index] != 0:
+        return []
+
+    g_score = array('i', [INF]) * (width * height)
+    came_from = array('i', [-1]) * (width * height)
+    closed = bytearray(width * height)
+
+    g_score[start_index] = 0
+    h = abs(start[0] - gx) + abs(start[1] - gy)
+    # Ties on f are broken by h so the search dives toward the goal
+    open_heap = [(h, h, start_index)]
+    push = heapq.heappush
+    pop = heapq.heappop
+
+    while open_heap:
+        _, _, current = pop(open_heap)
+        if closed[current]:
+            continue
+        if current == goal_index:
+            return reconstruct_path(came_from, current, width)
+        closed[current] = 1
+
+        y, x = divmod(current, width)
+        g = g_score[current] + 1
+        for neighbor, nx, ny, valid in (
+            (current - width, x, y - 1, y > 0),
+            (current + 1, x + 1, y, x < width - 1),
+            (current + width, x, y + 1, y < height - 1),
+            (current - 1, x - 1, y, x > 0),
+        ):
+            if valid and cells[neighbor] == 0 and g < g_score[neighbor]:
+                g_score[neighbor] = g
+                came_from[neighbor] = current
+                h = abs(nx - gx) + abs(ny - gy)
+                push(open_heap, (g + h, h, neighbor))
+
+    return []
+
+
+def bfs_distances(cells, width, height, source):
+    # Steps from source to every open cell, -1 where unreachable
+    distances = array('i', [-1]) * (width * height)
+    if cells[source] != 0:
+        return distances
+    distances[source] = 0
+    queue = [source]
+    for current in queue:  # the list grows while it is walked
+        y, x = divmod(current, width)
+        d = distances[current] + 1
+        for neighbor, valid in ((current - width, y > 0), (current + 1, x < width - 1),
+                                (current + width, y < height - 1), (current - 1, x > 0)):
+            if valid and cells[neighbor] == 0 and distances[neighbor] < 0:
+                distances[neighbor] = d
+                queue.append(neighbor)
+    return distances
+
+
+class FlowField:
+    # BFS steps to one source cell (the player), shared by every monster
+    # that chases it: a chaser steps to a neighbour one closer, no search of
+    # its own. The search stops `radius` steps out (None: whole maze), and
+    # moving the source clears only the cells the last search reached, so an
+    # update costs O(radius^2) however big the maze is.
+    def __init__(self, cells, width, height, radius=None):
+        self.cells = cells
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.distances = array('i', [-1]) * (width * height)
+        self.reached = []
+        self.source = None
+        # Bumped on every update, for copies of the field (MonsterSwarm)
+        self.version = 0
+
+    def update(self, source):
+        if source == self.source:
+            return
+        cells, width, height = self.cells, self.width, self.height
+        distances = self.distances
+        for cell in self.reached:
+            distances[cell] = -1
+        self.source = source
+        self.version += 1
+        self.reached = []
+        if cells[source] != 0:
+            return
+        limit = INF if self.radius is None else self.radius
+        distances[source] = 0
+        queue = self.reached = [source]
+        for current in queue:
+            d = distances[current] + 1
+            if d > limit:
+                break
+            y, x = divmod(current, width)
+            for neighbor, valid in ((current - width, y > 0), (current + 1, x < width - 1),
+                                    (current + width, y < height - 1), (current - 1, x > 0)):
+                if valid and cells[neighbor] == 0 and distances[neighbor] < 0:
+                    distances[neighbor] = d
+                    queue.append(neighbor)
+
+    def step(self, cell):
+        # Neighbour one step closer to the source, None at it or out of range
+        distances = self.distances
+        d = distances[cell]
+        if d <= 0:
+            return None
+        width = self.width
+        y, x = divmod(cell, width)
+        for neighbor, valid in ((cell - width, y > 0), (cell + 1, x < width - 1),
+                                (cell + width, y < self.height - 1), (cell - 1, x > 0)):
+            if valid and distances[neighbor] == d - 1:
+                return neighbor
+        return None
+
+
+class DStarLite:
+    # Incremental shortest paths to a fixed goal (D* Lite, Koenig & Likhachev).
+    # The search runs backwards from the goal, so when the start moves or the
+    # cost of entering a cell changes, only the affected part of the plan is
+    # repaired. Cells are flat indices (y * width + x) into `cells`.
+    # `distances` (from bfs_distances on the goal) seeds an already solved
+    # plan, so construction skips the initial search.
+    def __init__(self, cells, width, height, start, goal, distances=None):
+        self.cells = cells
+        self.width = width
+        self.height = height
+        self.start = self.last = start
+        self.goal = goal
+        self.km = 0
+        size = width * height
+        self.g = array('i', [INF]) * size
+        self.rhs = array('i', [INF]) * size
+        # Extra cost of entering a cell, on top of the one step
+        self.penalty = array('i', [0]) * size
+        # Heap with lazy deletion: an entry is live while open[cell] holds its key
+        self.heap = []
+        self.open = {}
+        if distances is not None:
+            for cell, distance in enumerate(distances):
+                if distance >= 0:
+                    self.g[cell] = self.rhs[cell] = distance
+        else:
+            self.rhs[goal] = 0
+            self.insert(goal)
+
+    def heuristic(self, cell):
+        y, x = divmod(cell, self.width)
+        sy, sx = divmod(self.start, self.width)
+        return abs(x - sx) + abs(y - sy)
+
+    def key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return best + self.heuristic(cell) + self.km, best
+
+    def insert(self, cell):
+        key = self.key(cell)
+        self.open[cell] = key
+        heapq.heappush(self.heap, (key, cell))
+
+    def neighbors(self, cell):
+        width = self.width
+        y, x = divmod(cell, width)
+        cells = self.cells
+        return [neighbor for neighbor, valid in ((cell - width, y > 0), (cell + 1, x < width - 1),
+                                                 (cell + width, y < self.height - 1), (cell - 1, x > 0))
+                if valid and cells[neighbor] == 0]
+
+    def update_vertex(self, cell):
+        if cell != self.goal:
+            g = self.g
+            penalty = self.penalty
+            best = INF
+            for neighbor in self.neighbors(cell):
+                if g[neighbor] < INF:
+                    best = min(best, g[neighbor] + 1 + penalty[neighbor])
+            self.rhs[cell] = best
+        self.open.pop(cell, None)
+        if self.g[cell] != self.rhs[cell]:
+            self.insert(cell)
+
+    def top_key(self):
+        heap = self.heap
+        while heap and self.open.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def compute(self):
+        g, rhs = self.g, self.rhs
+        start = self.start
+        while True:
+            top = self.top_key()
+            if top is None or (top >= self.key(start) and rhs[start] == g[start]):
+                return
+            cell = heapq.heappop(self.heap)[1]
+            del self.open[cell]
+            key = self.key(cell)
+            if top < key:
+                self.insert(cell)
+            elif g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+                for neighbor in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+            else:
+                g[cell] = INF
+                self.update_vertex(cell)
+                for neighbor in self.neighbors(cell):
+                    self.update_vertex(neighbor)
+
+    def move_to(self, cell):
+        # Keys already in the heap stay valid lower bounds thanks to km
+        self.start = cell
+        self.km += self.heuristic(self.last)
+        self.last = cell
+
+    def set_penalty(self, cell, penalty):
+        # Changes the cost of every edge into `cell`; call compute() afterwards
+        if self.penalty[cell] != penalty:
+            self.penalty[cell] = penalty
+            for neighbor in self.neighbors(cell):
+                self.update_vertex(neighbor)
+
+    def next_step(self, cell=None):
+        # Best neighbour to move to, None at the goal or when it is cut off
+        cell = self.start if cell is None else cell
+        if cell == self.goal or self.rhs[cell] >= INF:
+            return None
+        g, penalty = self.g, self.penalty
+        return min(self.neighbors(cell), key=lambda n: g[n] + penalty[n] if g[n] < INF else INF)
+
+    def path(self):
+        # Planned cells from start (exclusive) to goal (inclusive)
+        path = []
+        cell = self.next_step()
+        while cell is not None and len(path) < len(self.g):
+            path.append(cell)
+            cell = self.next_step(cell)
+        return path
+
+
+def reconstruct_path(came_from, current, width):
+    path = []
+    while came_from[current] != -1:
+        y, x = divmod(current, width)
+        path.append((x, y))
+        current = came_from[current]
+    path.reverse()
+    return path
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# Per-phase frame timing for the main loop.
+#   MAZE_PROFILE=1            start with the overlay on (F3 toggles it in game)
+#   MAZE_PROFILE_OUT=f.jsonl  also stream every frame to a .jsonl or .csv file
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+
+from renderer import draw_text
+
+PHASE_COLORS = [(230, 80, 80), (240, 160, 40), (220, 220, 60), (80, 200, 80),
+                (60, 170, 230), (120, 90, 220), (200, 90, 200), (150, 150, 150)]
+GRAPH_WIDTH = 240
+GRAPH_HEIGHT = 80
+TARGET_MS = 1000 / 60
+
+
+class FrameProfiler:
+    # phases: the CSV columns, known up front because a frame only has the
+    # phases it ran (no simulation tick, no dirty-rect pass, ...)
+    def __init__(self, enabled=False, output=None, history=GRAPH_WIDTH // 2, phases=()):
+        self.enabled = enabled
+        self.frames = deque(maxlen=history)
+        self.phases = {}
+        self.phase_names = []
+        self.frame_start = 0
+        self.last_mark = 0
+        # False until begin_frame() runs, e.g. when F3 turns profiling on mid-frame
+        self.in_frame = False
+        self.frame_count = 0
+        self.output = None
+        self.output_csv = False
+        self.csv_columns = list(phases)
+        self.csv_header = False
+        self.pending = []
+        if output:
+            self.output = open(output, 'w')
+            self.output_csv = output.endswith('.csv')
+
+    @classmethod
+    def from_env(cls, phases=()):
+        return cls(os.environ.get('MAZE_PROFILE', '') not in ('', '0'),
+                   os.environ.get('MAZE_PROFILE_OUT') or None, phases=phases)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frames.clear()
+        self.in_frame = False
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.phases = {}
+        self.frame_start = self.last_mark = time.perf_counter_ns()
+        self.in_frame = True
+
+    def mark(self, phase):
+        # Time since the previous mark is charged to `phase`
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last_mark
+        self.last_mark = now
+        if phase not in self.phase_names:
+            self.phase_names.append(phase)
+
+    def end_frame(self):
+        if not self.enabled or not self.in_frame:
+            return
+        self.in_frame = False
+        total = time.perf_counter_ns() - self.frame_start
+        self.frames.append((total, self.phases))
+        self.frame_count += 1
+        if self.output:
+            self.write_sample(total, self.phases)
+
+    def write_sample(self, total, phases):
+        if self.output_csv:
+            # A phase missing from the columns starts a new header line
+            new = [name for name in phases if name not in self.csv_columns]
+            if new or not self.csv_header:
+                self.csv_columns += new
+                self.csv_header = True
+                self.pending.append(','.join(['frame', 'total_us'] + self.csv_columns))
+            values = [str(phases.get(name, 0) // 1000) for name in self.csv_columns]
+            self.pending.append(','.join([str(self.frame_count), str(total // 1000)] + values))
+        else:
+            self.pending.append(json.dumps({
+                'frame': self.frame_count,
+                'total_us': total // 1000,
+                'phases_us': {name: ns // 1000 for name, ns in phases.items()},
+            }))
+        # Write in batches so file I/O stays out of most frames
+        if len(self.pending) >= 60:
+            self.flush()
+
+    def flush(self):
+        if self.output and self.pending:
+            self.output.write('\n'.join(self.pending) + '\n')
+            self.output.flush()
+            self.pending = []
+
+    def close(self):
+        self.flush()
+        if self.output:
+            self.output.close()
+            self.output = None
+
+    def draw(self, surface):
+        # Returns the rect of the overlay panel (None when hidden)
+        if not self.enabled or not self.frames:
+            return None
+        left = surface.get_width() - GRAPH_WIDTH - 10
+        top = surface.get_height() - GRAPH_HEIGHT - 70
+
+        panel = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT + 60), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 160))
+        panel_rect = surface.blit(panel, (left, top))
+
+        # Stacked bar per frame, one colour per phase; the line is 60 FPS
+        ms_to_px = GRAPH_HEIGHT / (TARGET_MS * 2)
+        bottom = top + GRAPH_HEIGHT
+        for i, (_, phases) in enumerate(self.frames):
+            y = bottom
+            for index, name in enumerate(self.phase_names):
+                height = phases.get(name, 0) / 1e6 * ms_to_px
+                if height >= 1:
+                    color = PHASE_COLORS[index % len(PHASE_COLORS)]
+                    pygame.draw.rect(surface, color, (left + i * 2, y - height, 2, height))
+                    y -= height
+        target_y = bottom - TARGET_MS * ms_to_px
+        pygame.draw.line(surface, (255, 255, 255), (left, target_y), (left + GRAPH_WIDTH, target_y))
+
+        totals = [total for total, _ in self.frames]
+        avg_ms = sum(totals) / len(totals) / 1e6
+        draw_text(surface, f"{1000 / avg_ms:.0f} FPS  {avg_ms:.2f} ms", 20, left + 4, bottom + 4,
+                  (255, 255, 255))
+        # Slowest phase of the last frame
+        last = self.frames[-1][1]
+        if last:
+            name = max(last, key=last.get)
+            draw_text(surface, f"{name}: {last[name] / 1e6:.2f} ms", 20, left + 4, bottom + 24,
+                      PHASE_COLORS[self.phase_names.index(name) % len(PHASE_COLORS)])
+        return panel_rect
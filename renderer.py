@@ -0,0 +1,620 @@
+# -*- coding: utf-8 -*-
+# Display and asset side of the game; the simulation itself lives in engine.py
+import pygame
+import time
+from collections import OrderedDict
+from assets import assets
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Game constants
+CELL_SIZE = 20  # Smaller cell size for better display
+WALL_THICKNESS = 2
+PLAYER_SIZE = 15
+PLAYER_COLOR = (255, 192, 203)
+WALL_COLOR = (128, 128, 128)
+PATH_COLOR = (255, 255, 255)
+EXIT_COLOR = (0, 255, 0)
+MONSTER_COLOR = (255, 0, 0)
+TEXT_COLOR = (0, 0, 0)
+BG_COLOR = (240, 240, 240)
+AI_COLOR = (0, 0, 255)
+INVINCIBLE_COLOR = (255, 100, 100)
+
+# Screen dimensions (smaller window)
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 600
+
+# Camera mode (ChunkedMazeRenderer)
+CHUNK_CELLS = 32
+CHUNK_CACHE_BYTES = 64 * 1024 * 1024
+MIN_ZOOM = 0.25
+MAX_ZOOM = 4.0
+# Below this many pixels per cell the fitted view switches to camera mode
+MIN_FIT_CELL_PX = 4
+
+
+# Loaded in the background while the menu is shown
+PRELOAD_GIFS = [("exit.gif", (CELL_SIZE, CELL_SIZE)), ("wall.gif", (CELL_SIZE, CELL_SIZE))]
+PRELOAD_IMAGES = [("player.png", (PLAYER_SIZE, PLAYER_SIZE)), ("monster.png", (CELL_SIZE // 2, CELL_SIZE // 2)),
+                  ("background.png", (SCREEN_WIDTH, SCREEN_HEIGHT), False)]
+
+
+def init_display():
+    # Initialize only what the game uses (no audio, joystick, ...) and create screen
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('Maze Game - Monster Edition')
+    return screen
+
+
+class ScaledSurfaceCache:
+    # LRU cache of (surface, size[, tint]) -> scaled Surface, so steady-state
+    # frames never call pygame.transform.scale
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, surface, size, tint=None):
+        key = (surface, size, tint)
+        scaled = self.entries.get(key)
+        if scaled is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return scaled
+
+        self.misses += 1
+        scaled = pygame.transform.scale(surface, size)
+        if tint is not None:
+            scaled.fill(tint, special_flags=pygame.BLEND_MULT)
+        self.entries[key] = scaled
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return scaled
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+# Shared cache for player/monster/exit sprites
+sprite_cache = ScaledSurfaceCache()
+
+
+class AnimatedGIF:
+    def __init__(self, filename, size):
+        # Frames are decoded once per process by the asset manager and shared
+        self.frames, self.durations = assets.gif(filename, size)
+        self.current_frame = 0
+        self.last_update = 0
+        self.scaled_cache = sprite_cache
+
+    def update(self):
+        now = time.time()
+        if now - self.last_update > self.durations[self.current_frame]:
+            self.current_frame = (self.current_frame + 1) % len(self.frames)
+            self.last_update = now
+
+    def get_current_frame(self):
+        return self.frames[self.current_frame]
+
+    def get_scaled_frame(self, size):
+        return self.scaled_cache.get(self.frames[self.current_frame], size)
+
+
+class MazeRenderer:
+    def __init__(self, maze):
+        self.maze = maze
+
+        # 加载GIF动画作为出口
+        self.exit_image = None
+        try:
+            self.exit_gif = AnimatedGIF("exit.gif", (CELL_SIZE, CELL_SIZE))
+        except:
+            self.exit_gif = None
+            try:
+                self.exit_image = assets.image("exit.png", (CELL_SIZE, CELL_SIZE))
+            except:
+                self.exit_image = None
+
+        # 加载GIF动画作为墙
+        try:
+            self.wall_gif = AnimatedGIF("wall.gif", (CELL_SIZE, CELL_SIZE))
+        except:
+            self.wall_gif = None
+
+        # Load monster image
+        try:
+            self.monster_image = assets.image("monster.png", (CELL_SIZE // 2, CELL_SIZE // 2))
+        except:
+            self.monster_image = None
+
+        # Cached wall/path layers, see draw()
+        self.layer_key = None
+        self.layers = {}
+
+    def layout(self):
+        maze = self.maze
+        # Calculate scale factors
+        scale_x = SCREEN_WIDTH / (maze.width * CELL_SIZE)
+        scale_y = SCREEN_HEIGHT / (maze.height * CELL_SIZE)
+        scale = min(scale_x, scale_y)
+
+        # Calculate offset to center the maze
+        offset_x = (SCREEN_WIDTH - maze.width * CELL_SIZE * scale) / 2
+        offset_y = (SCREEN_HEIGHT - maze.height * CELL_SIZE * scale) / 2
+        return offset_x, offset_y, scale
+
+    def update_animations(self):
+        # 更新GIF动画
+        if self.wall_gif:
+            self.wall_gif.update()
+        if self.exit_gif:
+            self.exit_gif.update()
+
+    def draw(self, surface):
+        offset_x, offset_y, scale = self.layout()
+        self.update_animations()
+        surface.blit(self.static_layer(scale), (int(offset_x), int(offset_y)))
+        self.draw_exit(surface, offset_x, offset_y, scale)
+        self.draw_monsters(surface, offset_x, offset_y, scale)
+        return offset_x, offset_y, scale
+
+    def static_layer(self, scale):
+        # Walls and paths only change with the grid or the scale, so they are
+        # pre-rendered into one layer (one per wall GIF frame) and blitted once
+        layer_key = (self.maze.grid_version, scale)
+        if layer_key != self.layer_key:
+            self.layer_key = layer_key
+            self.layers = {}
+        frame_index = self.wall_frame_index()
+        layer = self.layers.get(frame_index)
+        if layer is None:
+            layer = self.render_static_layer(scale)
+            self.layers[frame_index] = layer
+        return layer
+
+    def wall_frame_index(self):
+        return self.wall_gif.current_frame if self.wall_gif else 0
+
+    def exit_frame_index(self):
+        return self.exit_gif.current_frame if self.exit_gif else 0
+
+    def cell_rect(self, x, y, offset_x, offset_y, scale):
+        return pygame.Rect(
+            offset_x + x * CELL_SIZE * scale,
+            offset_y + y * CELL_SIZE * scale,
+            CELL_SIZE * scale,
+            CELL_SIZE * scale
+        )
+
+    def draw_exit(self, surface, offset_x, offset_y, scale):
+        exit_rect = self.cell_rect(self.maze.exit_pos[0], self.maze.exit_pos[1],
+                                   offset_x, offset_y, scale)
+
+        if self.exit_gif:
+            # 绘制GIF动画作为出口
+            scaled_frame = self.exit_gif.get_scaled_frame(
+                (int(CELL_SIZE * scale), int(CELL_SIZE * scale))
+            )
+            surface.blit(scaled_frame, exit_rect)
+        elif self.exit_image:
+            scaled_exit = sprite_cache.get(self.exit_image,
+                                           (int(CELL_SIZE * scale), int(CELL_SIZE * scale)))
+            surface.blit(scaled_exit, exit_rect)
+        else:
+            pygame.draw.rect(surface, EXIT_COLOR, exit_rect)
+        return exit_rect
+
+    def draw_monsters(self, surface, offset_x, offset_y, scale):
+        self.draw_monster_list(surface, self.maze.monsters, offset_x, offset_y, scale)
+
+    def draw_monster_list(self, surface, monsters, offset_x, offset_y, scale):
+        for monster in monsters:
+            center_x = offset_x + monster['x'] * CELL_SIZE * scale + CELL_SIZE * scale // 2
+            center_y = offset_y + monster['y'] * CELL_SIZE * scale + CELL_SIZE * scale // 2
+
+            if self.monster_image:
+                scaled_monster = sprite_cache.get(self.monster_image,
+                                                  (int(CELL_SIZE * scale // 2),
+                                                   int(CELL_SIZE * scale // 2)))
+                img_rect = scaled_monster.get_rect(center=(center_x, center_y))
+                surface.blit(scaled_monster, img_rect)
+            else:
+                pygame.draw.circle(
+                    surface, MONSTER_COLOR,
+                    (int(center_x), int(center_y)),
+                    int(CELL_SIZE * scale // 4)
+                )
+
+    def render_static_layer(self, scale):
+        return self.render_cells(0, 0, self.maze.width, self.maze.height, scale)
+
+    def render_cells(self, x0, y0, x1, y1, scale, walls=True):
+        # Walls and paths of cells [x0, x1) x [y0, y1) on a new surface;
+        # walls=False leaves wall cells transparent
+        maze = self.maze
+        cell = CELL_SIZE * scale
+        if maze.use_numpy and not self.wall_gif:
+            # Colour the grid one pixel per cell, then scale it up in one call
+            colors = np.where((maze.grid[y0:y1, x0:x1] == 1).T[:, :, None],
+                              np.array(WALL_COLOR, dtype=np.uint8),
+                              np.array(PATH_COLOR, dtype=np.uint8))
+            cells = pygame.surfarray.make_surface(colors)
+            return pygame.transform.scale(
+                cells, (int((x1 - x0) * cell), int((y1 - y0) * cell))
+            ).convert_alpha()
+
+        layer = pygame.Surface(
+            (int((x1 - x0) * cell) + 1, int((y1 - y0) * cell) + 1), pygame.SRCALPHA
+        )
+        wall_frame = None
+        if self.wall_gif:
+            wall_frame = self.wall_gif.get_scaled_frame((int(cell), int(cell)))
+
+        # Batch the wall blits into one call
+        wall_blits = []
+        for y in range(y0, y1):
+            row = maze.grid[y]
+            for x in range(x0, x1):
+                rect = pygame.Rect((x - x0) * cell, (y - y0) * cell, cell, cell)
+                if row[x] == 1:  # Wall
+                    if not walls:
+                        continue
+                    if wall_frame is not None:
+                        wall_blits.append((wall_frame, rect))
+                    else:
+                        layer.fill(WALL_COLOR, rect)
+                else:  # Path
+                    layer.fill(PATH_COLOR, rect)
+        layer.blits(wall_blits, doreturn=False)
+        return layer
+
+    def is_visible(self, x, y):
+        return True
+
+
+class ChunkedMazeRenderer(MazeRenderer):
+    # Scrolling camera for mazes larger than the screen. The camera follows
+    # a target cell at a fixed zoom; the maze is cut into CHUNK_CELLS-square
+    # chunks that are rendered on first view and kept in an LRU bounded by
+    # CHUNK_CACHE_BYTES. Only chunks and monsters inside the viewport are
+    # drawn, so a frame costs the same for any maze size. With the animated
+    # wall GIF, chunks hold paths only (walls left transparent) and sit on
+    # the current wall frame tiled once per frame change, so GIF frames never
+    # invalidate chunks.
+    def __init__(self, maze, zoom=1.0):
+        super().__init__(maze)
+        self.zoom = zoom
+        self.camera_x = maze.start_pos[0]
+        self.camera_y = maze.start_pos[1]
+        self.chunks = OrderedDict()
+        self.chunk_bytes = 0
+        self.chunk_key = None
+        self.wall_tiles = None
+        self.wall_tiles_key = None
+
+    def follow(self, x, y):
+        self.camera_x, self.camera_y = x, y
+
+    def set_zoom(self, zoom):
+        self.zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom))
+
+    def layout(self):
+        # Whole pixels per cell so chunks tile without seams
+        cell = max(1, int(CELL_SIZE * self.zoom))
+        scale = cell / CELL_SIZE
+        offset_x = SCREEN_WIDTH / 2 - (self.camera_x + 0.5) * cell
+        offset_y = SCREEN_HEIGHT / 2 - (self.camera_y + 0.5) * cell
+        # Keep the maze on screen, centred when it is smaller than the screen
+        offset_x = self.clamp_offset(offset_x, self.maze.width * cell, SCREEN_WIDTH)
+        offset_y = self.clamp_offset(offset_y, self.maze.height * cell, SCREEN_HEIGHT)
+        return int(offset_x), int(offset_y), scale
+
+    def clamp_offset(self, offset, maze_px, screen_px):
+        if maze_px <= screen_px:
+            return (screen_px - maze_px) / 2
+        return min(0, max(screen_px - maze_px, offset))
+
+    def visible_cells(self, offset_x, offset_y, scale):
+        cell = CELL_SIZE * scale
+        x0 = max(0, int(-offset_x // cell))
+        y0 = max(0, int(-offset_y // cell))
+        x1 = min(self.maze.width, int((SCREEN_WIDTH - offset_x) // cell) + 1)
+        y1 = min(self.maze.height, int((SCREEN_HEIGHT - offset_y) // cell) + 1)
+        return x0, y0, x1, y1
+
+    def is_visible(self, x, y):
+        x0, y0, x1, y1 = self.visible_cells(*self.layout())
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def draw(self, surface):
+        offset_x, offset_y, scale = self.layout()
+        self.update_animations()
+        cell = int(CELL_SIZE * scale)
+
+        key = (self.maze.grid_version, cell)
+        if key != self.chunk_key:
+            self.chunk_key = key
+            self.chunks.clear()
+            self.chunk_bytes = 0
+
+        x0, y0, x1, y1 = self.visible_cells(offset_x, offset_y, scale)
+        wall_tiles = self.tiled_wall_frame(cell) if self.wall_gif else None
+        clip = surface.get_rect()
+        for cy in range(y0 // CHUNK_CELLS, (y1 - 1) // CHUNK_CELLS + 1):
+            for cx in range(x0 // CHUNK_CELLS, (x1 - 1) // CHUNK_CELLS + 1):
+                chunk = self.chunk(cx, cy, scale)
+                left = offset_x + cx * CHUNK_CELLS * cell
+                top = offset_y + cy * CHUNK_CELLS * cell
+                if wall_tiles is not None:
+                    # Walls of the chunk's cells, aligned to the cell grid
+                    cells = pygame.Rect(left, top,
+                                        (min(self.maze.width, (cx + 1) * CHUNK_CELLS) - cx * CHUNK_CELLS) * cell,
+                                        (min(self.maze.height, (cy + 1) * CHUNK_CELLS) - cy * CHUNK_CELLS) * cell)
+                    visible = cells.clip(clip)
+                    area = pygame.Rect((visible.x - left) % cell, (visible.y - top) % cell,
+                                       visible.width, visible.height)
+                    surface.blit(wall_tiles, visible, area)
+                surface.blit(chunk, (left, top))
+
+        if self.is_visible(*self.maze.exit_pos):
+            self.draw_exit(surface, offset_x, offset_y, scale)
+        self.draw_monsters(surface, offset_x, offset_y, scale)
+        return offset_x, offset_y, scale
+
+    def tiled_wall_frame(self, cell):
+        # The current wall frame repeated over a screen-sized surface (plus
+        # one cell so any cell-aligned area fits), by doubling the tiled area;
+        # MAX onto the cleared surface copies pixels without alpha blending
+        key = (self.wall_frame_index(), cell)
+        if key != self.wall_tiles_key:
+            self.wall_tiles_key = key
+            width, height = SCREEN_WIDTH + cell, SCREEN_HEIGHT + cell
+            tiles = pygame.Surface((width, height), pygame.SRCALPHA)
+            tiles.blit(self.wall_gif.get_scaled_frame((cell, cell)), (0, 0))
+            filled = cell
+            while filled < width:
+                tiles.blit(tiles, (filled, 0), (0, 0, filled, cell), pygame.BLEND_RGBA_MAX)
+                filled *= 2
+            filled = cell
+            while filled < height:
+                tiles.blit(tiles, (0, filled), (0, 0, width, filled), pygame.BLEND_RGBA_MAX)
+                filled *= 2
+            self.wall_tiles = tiles
+        return self.wall_tiles
+
+    def chunk(self, cx, cy, scale):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        x0, y0 = cx * CHUNK_CELLS, cy * CHUNK_CELLS
+        chunk = self.render_cells(x0, y0, min(x0 + CHUNK_CELLS, self.maze.width),
+                                  min(y0 + CHUNK_CELLS, self.maze.height), scale,
+                                  walls=self.wall_gif is None)
+        self.chunks[key] = chunk
+        self.chunk_bytes += chunk.get_width() * chunk.get_height() * 4
+        while self.chunk_bytes > CHUNK_CACHE_BYTES and len(self.chunks) > 1:
+            _, old = self.chunks.popitem(last=False)
+            self.chunk_bytes -= old.get_width() * old.get_height() * 4
+        return chunk
+
+    def draw_monsters(self, surface, offset_x, offset_y, scale):
+        x0, y0, x1, y1 = self.visible_cells(offset_x, offset_y, scale)
+        monsters = self.maze.monsters
+        if hasattr(monsters, 'xs'):
+            # MonsterSwarm: cull with one vectorized mask
+            xs, ys = monsters.xs, monsters.ys
+            inside = (xs >= x0) & (xs < x1) & (ys >= y0) & (ys < y1)
+            visible = [{'x': x, 'y': y} for x, y in zip(xs[inside].tolist(), ys[inside].tolist())]
+        else:
+            visible = [m for m in monsters if x0 <= m['x'] < x1 and y0 <= m['y'] < y1]
+        self.draw_monster_list(surface, visible, offset_x, offset_y, scale)
+
+
+def interpolate(entity, alpha):
+    # Position between the previous tick (alpha 0) and the current one
+    # (alpha 1); jumps of more than one cell are not smoothed
+    dx, dy = entity.x - entity.prev_x, entity.y - entity.prev_y
+    if abs(dx) + abs(dy) > 1:
+        return entity.x, entity.y
+    return entity.prev_x + dx * alpha, entity.prev_y + dy * alpha
+
+
+class PlayerRenderer:
+    def __init__(self):
+        try:
+            self.image = assets.image("player.png", (PLAYER_SIZE, PLAYER_SIZE))
+        except:
+            self.image = None
+
+    def draw(self, surface, player, offset_x, offset_y, scale, position=None):
+        # position: (x, y) in cells to draw at instead of the player's cell
+        x, y = position or (player.x, player.y)
+        center_x = offset_x + x * CELL_SIZE * scale + CELL_SIZE * scale // 2
+        center_y = offset_y + y * CELL_SIZE * scale + CELL_SIZE * scale // 2
+
+        # Flash red if invincible
+        if player.invincible:
+            flash_interval = 0.2  # 0.2 seconds per flash
+            flash_on = int((player.clock() - player.invincible_start_time) / flash_interval) % 2 == 0
+            if flash_on:
+                color = INVINCIBLE_COLOR
+                if self.image:
+                    scaled_img = sprite_cache.get(self.image,
+                                                  (int(PLAYER_SIZE * scale),
+                                                   int(PLAYER_SIZE * scale)),
+                                                  tint=color)
+                    img_rect = scaled_img.get_rect(center=(center_x, center_y))
+                    surface.blit(scaled_img, img_rect)
+                    return
+                else:
+                    pygame.draw.circle(surface, color, (int(center_x), int(center_y)),
+                                       int(PLAYER_SIZE * scale // 2))
+                    return
+
+        if self.image:
+            scaled_img = sprite_cache.get(self.image,
+                                          (int(PLAYER_SIZE * scale),
+                                           int(PLAYER_SIZE * scale)))
+            img_rect = scaled_img.get_rect(center=(center_x, center_y))
+            surface.blit(scaled_img, img_rect)
+        else:
+            pygame.draw.circle(
+                surface, PLAYER_COLOR,
+                (int(center_x), int(center_y)),
+                int(PLAYER_SIZE * scale // 2)
+            )
+
+
+def draw_ai(surface, ai, offset_x, offset_y, scale, position=None):
+    x, y = position or (ai.x, ai.y)
+    center_x = offset_x + x * CELL_SIZE * scale + CELL_SIZE * scale // 2
+    center_y = offset_y + y * CELL_SIZE * scale + CELL_SIZE * scale // 2
+    pygame.draw.circle(
+        surface, AI_COLOR,
+        (int(center_x), int(center_y)),
+        int(PLAYER_SIZE * scale // 2)
+    )
+
+
+class DirtyRectRenderer:
+    # Redraws only what changed since the last frame: entity cells (old and
+    # new positions), the exit cell and the HUD are restored from a cached
+    # background (background image + maze layer) and pushed with
+    # pygame.display.update(rects). A wall GIF frame change or a new layout
+    # repaints the whole screen once.
+    def __init__(self, maze_renderer, player_renderer, background=None):
+        self.maze_renderer = maze_renderer
+        self.player_renderer = player_renderer
+        self.background_image = background
+        self.background = None
+        self.background_key = None
+        self.previous_rects = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def render(self, surface, game, draw_hud):
+        # draw_hud(surface) draws the HUD and returns the rects it touched
+        maze_renderer = self.maze_renderer
+        offset_x, offset_y, scale = maze_renderer.layout()
+        maze_renderer.update_animations()
+
+        key = (game.maze.grid_version, scale, maze_renderer.wall_frame_index())
+        if key != self.background_key:
+            self.background_key = key
+            if self.background is None:
+                self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+            if self.background_image:
+                self.background.blit(self.background_image, (0, 0))
+            else:
+                self.background.fill(BG_COLOR)
+            self.background.blit(maze_renderer.static_layer(scale), (int(offset_x), int(offset_y)))
+            self.full_redraw = True
+
+        if self.full_redraw:
+            surface.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                surface.blit(self.background, rect, rect)
+
+        rects = [maze_renderer.draw_exit(surface, offset_x, offset_y, scale)]
+        maze_renderer.draw_monsters(surface, offset_x, offset_y, scale)
+        for monster in game.maze.monsters:
+            rects.append(maze_renderer.cell_rect(monster['x'], monster['y'], offset_x, offset_y, scale))
+        self.player_renderer.draw(surface, game.player, offset_x, offset_y, scale)
+        rects.append(maze_renderer.cell_rect(game.player.x, game.player.y, offset_x, offset_y, scale))
+        if game.ai:
+            draw_ai(surface, game.ai, offset_x, offset_y, scale)
+            rects.append(maze_renderer.cell_rect(game.ai.x, game.ai.y, offset_x, offset_y, scale))
+        rects.extend(draw_hud(surface))
+        rects = [rect.inflate(2, 2) for rect in rects if rect]
+
+        if self.full_redraw:
+            update = [surface.get_rect()]
+            self.full_redraw = False
+        else:
+            update = self.previous_rects + rects
+        self.previous_rects = rects
+        return offset_x, offset_y, scale, update
+
+
+class TextCache:
+    # Font objects per size and rendered text surfaces per (text, size, color),
+    # LRU-bounded; the HUD only re-renders when its text changes
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.fonts = {}
+        self.rendered = OrderedDict()
+        self.overlays = {}
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.SysFont(None, size)
+        return font
+
+    def render(self, text, size, color):
+        key = (text, size, color)
+        text_surface = self.rendered.get(key)
+        if text_surface is not None:
+            self.hits += 1
+            self.rendered.move_to_end(key)
+            return text_surface
+
+        self.misses += 1
+        text_surface = self.font(size).render(text, True, color)
+        self.rendered[key] = text_surface
+        if len(self.rendered) > self.max_entries:
+            self.rendered.popitem(last=False)
+        return text_surface
+
+    def overlay(self, size, color):
+        # Reused translucent full-screen fill
+        key = (size, color)
+        overlay = self.overlays.get(key)
+        if overlay is None:
+            overlay = self.overlays[key] = pygame.Surface(size, pygame.SRCALPHA)
+            overlay.fill(color)
+        return overlay
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.rendered),
+                'fonts': len(self.fonts), 'hit_rate': self.hits / total if total else 0.0}
+
+
+text_cache = TextCache()
+
+
+def draw_text(surface, text, size, x, y, color=TEXT_COLOR):
+    text_surface = text_cache.render(text, size, color)
+    text_rect = text_surface.get_rect()
+    text_rect.topleft = (x, y)
+    surface.blit(text_surface, text_rect)
+    return text_rect
+
+
+def show_message(surface, message, color=(255, 0, 0)):
+    text = text_cache.render(message, 72, color)
+    text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+
+    surface.blit(text_cache.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), (255, 255, 255, 180)), (0, 0))
+
+    surface.blit(text, text_rect)
+    pygame.display.flip()
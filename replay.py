@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Replays: a game is fully determined by its maze (seed + options) and the
+# tick at which each player move happened, so that is all a replay stores.
+#
+# File layout: one JSON header line, then one varint per move holding
+# (ticks since the previous move) * 5 + direction, then an end record
+# (direction code 4) and a JSON summary line with the outcome.
+#   MAZE_RECORD=replays python main.py      record every game into a directory
+#   MAZE_REPLAY=file.replay python main.py  watch a replay at normal speed
+#   python replay.py FILE [FILE ...]        play back headless, check outcomes
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+
+from engine import Game, Maze
+from mazefile import load_maze
+
+VERSION = 1
+END = 4
+# Encoded moves are handed to the writer thread in chunks of this many bytes
+FLUSH_BYTES = 256
+
+
+def encode_varint(value):
+    data = bytearray()
+    while value >= 0x80:
+        data.append(value & 0x7f | 0x80)
+        value >>= 7
+    data.append(value)
+    return data
+
+
+def game_header(game):
+    maze = game.maze
+    return {
+        'version': VERSION,
+        'mode': game.mode,
+        'ai_mode': game.ai_mode,
+        'width': maze.width,
+        'height': maze.height,
+        'seed': maze.seed,
+        'algorithm': maze.algorithm,
+        'use_numpy': maze.use_numpy,
+        'vectorized_monsters': maze.vectorized_monsters,
+        'monster_mode': maze.monster_mode,
+        'chase_radius': maze.chase_radius,
+        'monster_count': len(maze.monsters),
+        'maze_file': maze.source_file,
+    }
+
+
+def game_summary(game):
+    return {
+        'ticks': game.frame,
+        'status': game.status(),
+        'steps': game.player.steps,
+        'lives': game.player.lives,
+        'ai_steps': game.ai.steps if game.ai else None,
+    }
+
+
+class ReplayWriter:
+    # record() only appends to a buffer; a daemon thread does the file I/O,
+    # so the game loop never waits on the disk
+    def __init__(self, path, game):
+        self.game = game
+        self.buffer = bytearray()
+        self.last_tick = 0
+        self.chunks = queue.SimpleQueue()
+        self.file = open(path, 'wb')
+        self.chunks.put(json.dumps(game_header(game)).encode() + b'\n')
+        self.thread = threading.Thread(target=self.write_chunks, daemon=True)
+        self.thread.start()
+
+    def write_chunks(self):
+        while True:
+            data = self.chunks.get()
+            if data is None:
+                break
+            self.file.write(data)
+            self.file.flush()
+        self.file.close()
+
+    def record(self, tick, direction):
+        self.buffer += encode_varint((tick - self.last_tick) * 5 + direction)
+        self.last_tick = tick
+        if len(self.buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.chunks.put(bytes(self.buffer))
+            self.buffer = bytearray()
+
+    def close(self):
+        if self.thread is None:
+            return
+        self.buffer += encode_varint((self.game.frame - self.last_tick) * 5 + END)
+        self.buffer += json.dumps(game_summary(self.game)).encode() + b'\n'
+        self.flush()
+        self.chunks.put(None)
+        self.thread.join()
+        self.thread = None
+
+
+class Replay:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        header_end = data.index(b'\n') + 1
+        self.header = json.loads(data[:header_end])
+        if self.header.get('version') != VERSION:
+            raise ValueError(f"{path}: unsupported replay version")
+
+        # tick -> direction; a file cut short (crash) keeps the moves before it
+        self.moves = {}
+        self.summary = None
+        tick = value = shift = 0
+        position = header_end
+        while position < len(data):
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if byte & 0x80:
+                continue
+            delta, code = divmod(value, 5)
+            tick += delta
+            value = shift = 0
+            if code == END:
+                self.summary = json.loads(data[position:data.index(b'\n', position)])
+                break
+            self.moves[tick] = code
+        self.end_tick = self.summary['ticks'] if self.summary else tick + 1
+
+    def new_game(self):
+        header = self.header
+        # Replays recorded before monster modes existed are all "wander"
+        monster_mode = header.get('monster_mode', "wander")
+        chase_radius = header.get('chase_radius')
+        if header['maze_file']:
+            maze = load_maze(header['maze_file'], use_numpy=header['use_numpy'],
+                             vectorized_monsters=header['vectorized_monsters'], monster_mode=monster_mode,
+                             chase_radius=chase_radius)
+        else:
+            maze = Maze(header['width'], header['height'], use_numpy=header['use_numpy'],
+                        algorithm=header['algorithm'], monster_count=header['monster_count'],
+                        vectorized_monsters=header['vectorized_monsters'], seed=header['seed'],
+                        monster_mode=monster_mode, chase_radius=chase_radius)
+        return Game(header['mode'], ai_mode=header['ai_mode'], maze=maze)
+
+    def move_at(self, tick):
+        return self.moves.get(tick)
+
+    def play(self, game=None):
+        # Headless: as fast as the simulation goes, returns the final game
+        game = game or self.new_game()
+        moves = self.moves
+        # A move that ends the game does so without advancing the tick
+        while (game.frame < self.end_tick or game.frame in moves) and not game.game_over:
+            game.step(moves.get(game.frame))
+        return game
+
+    def matches(self, game):
+        # True when the played game ended like the recorded one (None: unknown)
+        if self.summary is None:
+            return None
+        return game_summary(game) == self.summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play replays back headless and check their outcomes")
+    parser.add_argument('files', nargs='+')
+    args = parser.parse_args()
+
+    mismatches = 0
+    for path in args.files:
+        replay = Replay(path)
+        t0 = time.perf_counter()
+        game = replay.play()
+        elapsed = time.perf_counter() - t0
+        summary = game_summary(game)
+        match = replay.matches(game)
+        mismatches += match is False
+        print(f"{os.path.basename(path)}: {summary['status']} ticks={summary['ticks']} "
+              f"steps={summary['steps']} lives={summary['lives']} "
+              f"{summary['ticks'] / max(elapsed, 1e-9):,.0f} ticks/s "
+              f"{'' if match is None else 'ok' if match else 'MISMATCH'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from corridors import ClusterLayer, CorridorGraph
+from engine import Maze
+from pathfinding import bfs_distances, flatten_grid
+
+
+# A ring hanging off a stem: the ring is one corridor from the junction
+# below it back to the same junction, so cells on it attach to that node
+# twice, the short way and the long way round
+RING = [
+    "#######",
+    "#.....#",
+    "#.###.#",
+    "#.###.#",
+    "#.....#",
+    "###.###",
+    "###.###",
+]
+
+
+def ring_cells():
+    return bytearray(1 if c == '#' else 0 for row in RING for c in row)
+
+
+def looped_maze(seed, size=41):
+    # A perfect maze with walls knocked out, so corridors form loops
+    maze = Maze(size, size, monster_count=0, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(size * size // 20):
+        maze.grid[rng.randrange(1, size - 1)][rng.randrange(1, size - 1)] = 0
+    return maze
+
+
+def indexes(cells, width, height):
+    graph = CorridorGraph(cells, width, height)
+    return graph, ClusterLayer(CorridorGraph(cells[:], width, height), cluster_size=8)
+
+
+def check_lengths(index, cells, width, height, rng, queries=40):
+    open_cells = [cell for cell, wall in enumerate(cells) if wall == 0]
+    for _ in range(queries):
+        start, goal = rng.choice(open_cells), rng.choice(open_cells)
+        distance = bfs_distances(cells, width, height, goal)[start]
+        legs = index.path(start, goal)
+        if distance < 0:
+            assert legs is None
+            continue
+        walked = list(index.walk(legs))
+        assert len(walked) == distance
+        assert walked[-1:] == ([goal] if distance else [])
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_path_lengths_match_bfs(seed):
+    maze = looped_maze(seed)
+    cells = flatten_grid(maze.grid, maze.width, maze.height)
+    rng = random.Random(seed)
+    for index in indexes(cells, maze.width, maze.height):
+        check_lengths(index, cells, maze.width, maze.height, rng)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_path_lengths_match_bfs_after_updates(seed):
+    maze = looped_maze(seed)
+    width, height = maze.width, maze.height
+    cells = flatten_grid(maze.grid, width, height)
+    rng = random.Random(seed)
+    for index in indexes(cells, width, height):
+        graph = index.graph if isinstance(index, ClusterLayer) else index
+        for _ in range(30):
+            cell = rng.randrange(width, width * (height - 1))
+            if 0 < cell % width < width - 1:
+                index.update(cell, 1 - graph.cells[cell])
+        check_lengths(index, graph.cells, width, height, rng)
+
+
+def test_goal_on_a_self_loop_takes_the_short_way_round():
+    cells = ring_cells()
+    width, height = len(RING[0]), len(RING)
+    empty = bytearray([1]) * len(cells)
+    incremental = CorridorGraph(empty, width, height)
+    for cell, wall in enumerate(cells):
+        if wall == 0:
+            incremental.update(cell, 0)
+    stem = 6 * width + 3
+    for index in indexes(cells, width, height) + (incremental,):
+        for goal in (1 * width + 2, 1 * width + 4):
+            walked = list(index.walk(index.path(stem, goal)))
+            assert len(walked) == bfs_distances(cells, width, height, goal)[stem] == 8
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip('numpy')
+
+from engine import Game, Maze, RIGHT, DOWN
+
+
+def test_fresh_swarm_only_occupies_its_own_cells():
+    maze = Maze(31, 31, use_numpy=True, vectorized_monsters=True, seed=1)
+    monsters = set(maze.monster_positions())
+    for y in range(maze.height):
+        for x in range(maze.width):
+            assert maze.check_monster_collision(x, y) == ((x, y) in monsters)
+
+
+def test_empty_swarm_reports_no_collision():
+    maze = Maze(31, 31, use_numpy=True, vectorized_monsters=True, monster_count=0, seed=1)
+    assert not maze.check_monster_collision(*maze.start_pos)
+
+
+def test_first_step_does_not_cost_a_life():
+    game = Game("single", 31, 31, use_numpy=True, vectorized_monsters=True, seed=1)
+    game.step(RIGHT if game.maze.grid[1][2] == 0 else DOWN)
+    assert game.player.lives == 3
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Bulk AI-vs-maze games on every core, no display.
+#   python tournament.py --games 1000 [--size 31] [--monsters 5] [--ai field|dstar]
+#                        [--monster-mode chase [--chase-radius 20]] [--workers 8] [--chunk 16]
+#                        [--output games.jsonl]
+# Each game is one seeded maze: the AI walks to the exit while the monsters
+# roam (or hunt it, --monster-mode chase); it wins at the exit and loses
+# after running into monsters `lives` times (with the player's invincibility
+# after each hit) or at --max-ticks.
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from engine import AI_MODES, AI_MOVE_INTERVAL, FPS, MONSTER_COUNT, MONSTER_MODES, MONSTER_MOVE_INTERVAL, Maze
+
+LIVES = 3
+INVINCIBLE_TICKS = 2 * FPS
+STATS = ['steps', 'ticks', 'solve_ms', 'monster_hits']
+
+
+def play_game(seed, width, height, ai_mode, monster_count, vectorized, max_ticks, monster_mode="wander",
+              chase_radius=None):
+    maze = Maze(width, height, monster_count=monster_count, vectorized_monsters=vectorized,
+                use_numpy=vectorized, seed=seed, monster_mode=monster_mode, chase_radius=chase_radius)
+    ai = AI_MODES[ai_mode](maze)
+    # Maze() already solved the maze for its distance field; dropping the
+    # cached solutions makes the AI build its own (distance field, D* plan
+    # or path index) inside the timing
+    maze.mark_grid_changed()
+    t0 = time.perf_counter()
+    ai.find_path_to_exit()
+    solve_ms = (time.perf_counter() - t0) * 1000
+
+    lives = LIVES
+    hits = 0
+    invincible_until = 0
+    status = "timeout"
+    for tick in range(1, max_ticks + 1):
+        if tick % MONSTER_MOVE_INTERVAL == 0:
+            maze.set_chase_target(ai.x, ai.y)
+            maze.move_monsters()
+        ai.update()
+        if ai.is_at_exit():
+            status = "win"
+            break
+        if tick >= invincible_until and maze.check_monster_collision(ai.x, ai.y):
+            hits += 1
+            lives -= 1
+            invincible_until = tick + INVINCIBLE_TICKS
+            if lives <= 0:
+                status = "lose"
+                break
+    return {
+        'seed': seed,
+        'status': status,
+        'steps': ai.steps,
+        'ticks': tick,
+        'solve_ms': round(solve_ms, 3),
+        'monster_hits': hits,
+    }
+
+
+def play_chunk(seeds, options):
+    # One task per chunk of seeds keeps the pickling/IPC overhead per game small
+    return [play_game(seed, **options) for seed in seeds]
+
+
+class RunningStats:
+    # Streaming mean / standard deviation (Welford), min and max
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many seeded AI games in parallel")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--size', default='31', help="W or WxH")
+    parser.add_argument('--monsters', type=int, default=MONSTER_COUNT)
+    parser.add_argument('--ai', choices=sorted(AI_MODES), default='field')
+    parser.add_argument('--vectorized', action='store_true', help="MonsterSwarm monsters (numpy)")
+    parser.add_argument('--monster-mode', choices=MONSTER_MODES, default='wander',
+                        help="chase: monsters hunt the AI")
+    parser.add_argument('--chase-radius', type=int, help="chasers only within this many steps")
+    parser.add_argument('--max-ticks', type=int, help="default: time to walk every cell")
+    parser.add_argument('--seed', type=int, default=0, help="first seed, then seed + 1, ...")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk', type=int, default=16, help="games per task")
+    parser.add_argument('--output', help="write one JSON line per game")
+    args = parser.parse_args()
+
+    width, _, height = args.size.lower().partition('x')
+    width = int(width)
+    height = int(height) if height else width
+    options = dict(width=width, height=height, ai_mode=args.ai, monster_count=args.monsters,
+                   vectorized=args.vectorized, monster_mode=args.monster_mode,
+                   chase_radius=args.chase_radius,
+                   max_ticks=args.max_ticks or width * height * AI_MOVE_INTERVAL)
+    seeds = range(args.seed, args.seed + args.games)
+    chunks = [seeds[i:i + args.chunk] for i in range(0, len(seeds), args.chunk)]
+
+    stats = {name: RunningStats() for name in STATS}
+    wins = done = 0
+    output = open(args.output, 'w') if args.output else None
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as executor:
+        futures = [executor.submit(play_chunk, chunk, options) for chunk in chunks]
+        for future in as_completed(futures):
+            rows = future.result()
+            for row in rows:
+                done += 1
+                wins += row['status'] == "win"
+                for name in STATS:
+                    stats[name].add(row[name])
+            if output:
+                output.write(''.join(json.dumps(row) + '\n' for row in rows))
+                output.flush()
+            print(f"\r{done}/{args.games} games  win rate {wins / done:.1%}", end='', flush=True)
+    elapsed = time.perf_counter() - t0
+    if output:
+        output.close()
+
+    print(f"\n{done} games in {elapsed:.2f}s ({done / elapsed:.1f} games/s, {args.workers} workers), "
+          f"win rate {wins / max(done, 1):.1%}")
+    print(f"{'':<14} {'mean':>10} {'std':>10} {'min':>10} {'max':>10}")
+    for name in STATS:
+        s = stats[name]
+        print(f"{name:<14} {s.mean:>10.2f} {s.std:>10.2f} {s.min:>10.2f} {s.max:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+# Batched environment for training agents: N single-player games stepped
+# together with NumPy, no per-game Python loop in step(). Needs numpy.
+#
+#   env = VecMazeEnv(1024, seed=0)
+#   obs = env.reset()
+#   obs, reward, done, info = env.step(actions)   # actions: (N,) ints
+#
+# One step is one Game.step tick: action 0-3 moves UP/RIGHT/DOWN/LEFT, 4
+# stays. Monsters move every MONSTER_MOVE_INTERVAL ticks, a hit costs a life
+# and gives 2 seconds (in ticks) of invincibility, like the game. Finished
+# games are reset at once, so the returned observation of a done game is the
+# first one of its next game.
+import numpy as np
+
+from engine import FPS, MONSTER_COUNT, MONSTER_MOVE_INTERVAL, Maze
+from monsters import DIRECTION_DX, DIRECTION_DY
+
+STAY = 4
+LIVES = 3
+INVINCIBLE_TICKS = 2 * FPS
+# Observation window cells
+OPEN, WALL, MONSTER, EXIT = 0, 1, 2, 3
+
+
+class VecMazeEnv:
+    # Mazes come from a pool generated up front; every game plays one pool
+    # maze. Cells are flat indices into the maze padded with `radius` rings
+    # of walls (index = (y + pad) * stride + x + pad), so moves are adds and
+    # observation windows are one gather.
+    def __init__(self, num_envs, width=31, height=31, monster_count=MONSTER_COUNT, pool_size=64,
+                 radius=5, max_ticks=10000, seed=None):
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.monster_count = monster_count
+        self.max_ticks = max_ticks
+        self.rng = np.random.default_rng(seed)
+        self.pad = max(1, radius)
+        self.stride = width + 2 * self.pad
+        self.cells_per_maze = (height + 2 * self.pad) * self.stride
+        self.offsets = np.append(DIRECTION_DY * self.stride + DIRECTION_DX, 0).astype(np.int32)
+        window = np.arange(-radius, radius + 1, dtype=np.int32)
+        self.window_offsets = (window[:, None] * self.stride + window[None, :]).ravel()
+        self.window_size = 2 * radius + 1
+
+        self.build_pool(pool_size, int(self.rng.integers(2 ** 63)))
+        self.env_base = np.arange(num_envs, dtype=np.int64) * self.cells_per_maze
+        # Monster occupancy, same stamp scheme as MonsterSwarm
+        self.occupancy = np.zeros(num_envs * self.cells_per_maze, dtype=np.int32)
+        self.stamp = 0
+
+        n = num_envs
+        self.maze_index = np.zeros(n, dtype=np.int64)
+        self.player = np.zeros(n, dtype=np.int32)
+        self.lives = np.zeros(n, dtype=np.int8)
+        self.ticks = np.zeros(n, dtype=np.int32)
+        self.invincible_until = np.zeros(n, dtype=np.int32)
+        self.monsters = np.zeros((n, monster_count), dtype=np.int32)
+        self.speeds = np.zeros((n, monster_count), dtype=np.int32)
+        self.directions = np.zeros((n, monster_count), dtype=np.int32)
+
+    def build_pool(self, pool_size, seed):
+        # Walls of every pool maze in one flat array, plus spawn candidates
+        pad = self.pad
+        walls = np.ones((pool_size, self.height + 2 * pad, self.stride), dtype=np.uint8)
+        candidates = []
+        for i in range(pool_size):
+            maze = Maze(self.width, self.height, use_numpy=True, monster_count=0, seed=seed + i)
+            walls[i, pad:pad + self.height, pad:pad + self.width] = maze.grid
+            ys, xs = np.nonzero(maze.grid == 0)
+            # Ensure monster is on path and not near start/exit
+            far = (np.abs(xs - maze.start_pos[0]) + np.abs(ys - maze.start_pos[1]) > 10)
+            far &= (xs != maze.exit_pos[0]) | (ys != maze.exit_pos[1])
+            candidates.append((ys[far] + pad) * self.stride + xs[far] + pad)
+        self.walls = walls.reshape(-1)
+        self.pool_base = np.arange(pool_size, dtype=np.int64) * self.cells_per_maze
+        self.start_cell = (maze.start_pos[1] + pad) * self.stride + maze.start_pos[0] + pad
+        self.exit_cell = (maze.exit_pos[1] + pad) * self.stride + maze.exit_pos[0] + pad
+
+        # Ragged candidate lists as one padded array; empty lists fall back to the exit row
+        self.candidate_counts = np.array([max(1, len(c)) for c in candidates], dtype=np.int64)
+        self.candidates = np.full((pool_size, int(self.candidate_counts.max())), self.exit_cell,
+                                  dtype=np.int32)
+        for i, c in enumerate(candidates):
+            self.candidates[i, :len(c)] = c
+
+    def reset(self):
+        self.reset_envs(np.ones(self.num_envs, dtype=bool))
+        self.refresh_occupancy()
+        return self.observe()
+
+    def reset_envs(self, mask):
+        count = int(mask.sum())
+        if not count:
+            return
+        rng = self.rng
+        maze_index = rng.integers(0, len(self.pool_base), count)
+        self.maze_index[mask] = maze_index
+        self.player[mask] = self.start_cell
+        self.lives[mask] = LIVES
+        self.ticks[mask] = 0
+        self.invincible_until[mask] = 0
+        shape = (count, self.monster_count)
+        picks = (rng.random(shape) * self.candidate_counts[maze_index][:, None]).astype(np.int64)
+        self.monsters[mask] = self.candidates[maze_index[:, None], picks]
+        self.speeds[mask] = rng.integers(1, 3, shape)
+        self.directions[mask] = rng.integers(0, 4, shape)
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int32)
+        walls = self.walls
+        maze_base = self.pool_base[self.maze_index]
+        self.ticks += 1
+
+        # Player moves, unless blocked by a wall
+        target = self.player + self.offsets[actions]
+        can_move = walls[maze_base + target] == 0
+        np.copyto(self.player, target, where=can_move)
+        hit = self.collide()
+
+        # Monsters of the games whose monster timer fired
+        due = (self.ticks % MONSTER_MOVE_INTERVAL == 0)
+        if self.monster_count and due.any():
+            self.move_monsters(due, maze_base)
+            self.refresh_occupancy()
+            hit |= self.collide()
+
+        self.lives -= hit
+        self.invincible_until[hit] = self.ticks[hit] + INVINCIBLE_TICKS
+        win = self.player == self.exit_cell
+        lose = self.lives <= 0
+        truncated = (self.ticks >= self.max_ticks) & ~win & ~lose
+        done = win | lose | truncated
+        reward = win.astype(np.float32) - hit
+
+        info = {'win': win, 'lose': lose, 'truncated': truncated, 'hit': hit}
+        if done.any():
+            self.reset_envs(done)
+            self.refresh_occupancy()
+        return self.observe(), reward, done, info
+
+    def move_monsters(self, due, maze_base):
+        rng = self.rng
+        cells = self.monsters
+        directions = self.directions
+        base = maze_base[:, None]
+        active = np.broadcast_to(due[:, None], cells.shape)
+
+        # 10% chance to change direction
+        turn = active & (rng.random(cells.shape) < 0.1)
+        directions[turn] = rng.integers(0, 4, int(turn.sum()))
+
+        # One sub-step per point of speed; a monster that hits a wall turns
+        for step in range(int(self.speeds.max())):
+            moving = active & (self.speeds > step)
+            new_cells = cells + self.offsets[directions]
+            can_move = moving & (self.walls[base + new_cells] == 0)
+            np.copyto(cells, new_cells, where=can_move)
+            blocked = moving & ~can_move
+            directions[blocked] = rng.integers(0, 4, int(blocked.sum()))
+
+    def refresh_occupancy(self):
+        self.stamp += 1
+        self.occupancy[(self.env_base[:, None] + self.monsters).ravel()] = self.stamp
+
+    def collide(self):
+        # Players on a monster cell and not invincible
+        on_monster = self.occupancy[self.env_base + self.player] == self.stamp
+        return on_monster & (self.ticks >= self.invincible_until)
+
+    def observe(self):
+        # window: cells around each player (OPEN / WALL / MONSTER / EXIT),
+        # position: player (x, y), lives
+        cells = self.player[:, None] + self.window_offsets[None, :]
+        window = self.walls[self.pool_base[self.maze_index][:, None] + cells]
+        window[self.occupancy[self.env_base[:, None] + cells] == self.stamp] = MONSTER
+        window[cells == self.exit_cell] = EXIT
+        position = np.stack([self.player % self.stride, self.player // self.stride], axis=1) - self.pad
+        return {
+            'window': window.reshape(self.num_envs, self.window_size, self.window_size),
+            'position': position,
+            'lives': self.lives.copy(),
+        }